@@ -16,8 +16,17 @@ Layout:
 
 from __future__ import annotations
 
+import asyncio
+import itertools
+import posixpath
+import re
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
+from typing import Callable, Iterable
+from urllib.parse import urlsplit
 import mimetypes
 
 import qrcode
@@ -25,8 +34,8 @@ from textual import events, on, work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Horizontal, Vertical
-from textual.reactive import reactive
 from textual.screen import ModalScreen
+from textual.timer import Timer
 from textual.widgets import (
     Button,
     DataTable,
@@ -39,9 +48,38 @@ from textual.widgets import (
     Static,
 )
 
+from . import device_cache
 from .cast_manager import CastManager, DeviceInfo, PlaybackState, SUPPORTED_EXTENSIONS
 from .media_server import MediaServer
 
+# Minimum seconds between seek-preview label updates while hovering (20Hz);
+# the last pointer position is always shown once the interval passes.
+SEEK_PREVIEW_INTERVAL = 0.05
+
+# Playback state events arriving within this window are applied as one update.
+STATE_FLUSH_DELAY = 0.1
+
+# Volume presses within this window are sent as one RPC at the final level;
+# a held key therefore updates the device at most this often.
+VOLUME_FLUSH_INTERVAL = 0.12
+
+# Quiet period after the last filter keystroke before the device table is updated.
+FILTER_DEBOUNCE = 0.1
+
+# Quiet period after the last seek key press; held arrows add up into one seek.
+SEEK_DEBOUNCE = 0.15
+
+# Load the system mime tables at import rather than on the first cast.
+mimetypes.init()
+
+_STATUS_ICONS = {"playing": "▶", "paused": "⏸", "buffering": "⟳", "idle": "■"}
+
+# Error text that suggests the device connection dropped and a reconnect may help.
+_CONN_ERR_RE = re.compile(
+    r"not connected|connection|timeout|socket|broken pipe|reset by peer|transport",
+    re.IGNORECASE,
+)
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Small helper widgets
@@ -58,16 +96,23 @@ class NowPlayingBar(Static):
     }
     """
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._last_rendered = ""
+
     def update_state(self, state: PlaybackState) -> None:
-        icon = {"playing": "▶", "paused": "⏸", "buffering": "⟳", "idle": "■"}.get(
-            state.status, "■"
-        )
+        icon = _STATUS_ICONS.get(state.status, "■")
         if state.title:
             dur = _fmt_time(state.duration)
             cur = _fmt_time(state.current_time)
-            self.update(f" {icon}  {state.title}  [{cur} / {dur}]")
+            text = f" {icon}  {state.title}  [{cur} / {dur}]"
         else:
-            self.update(f" {icon}  —")
+            text = f" {icon}  —"
+        # Skip the repaint when the visible text is unchanged
+        if text == self._last_rendered:
+            return
+        self._last_rendered = text
+        self.update(text)
 
 
 class VolumeBar(Horizontal):
@@ -86,9 +131,38 @@ class VolumeBar(Horizontal):
     }
     """
 
+    def __init__(self, initial: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._initial = initial
+
     def compose(self) -> ComposeResult:
         yield Label("VOL")
-        yield Input(value="80", id="vol-input", placeholder="0-100")
+        yield Input(value=str(self._initial), id="vol-input", placeholder="0-100")
+
+
+class SeekBar(ProgressBar):
+    """ProgressBar that tracks its own width so pointer math skips layout lookups."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.last_x = 0
+        self.div = 1
+
+    def on_resize(self, event: events.Resize) -> None:
+        width = max(1, event.size.width)
+        self.last_x = width - 1
+        self.div = max(1, self.last_x)
+
+
+class MediaDirectoryTree(DirectoryTree):
+    """DirectoryTree that only lists folders and files we can cast."""
+
+    def filter_paths(self, paths: Iterable[Path]) -> Iterable[Path]:
+        # Check the suffix first so castable files never need a stat
+        return [
+            p for p in paths
+            if p.suffix.lower() in SUPPORTED_EXTENSIONS or self._safe_is_dir(p)
+        ]
 
 
 class MobileConnectScreen(ModalScreen[None]):
@@ -126,15 +200,16 @@ class MobileConnectScreen(ModalScreen[None]):
 
     BINDINGS = [Binding("escape", "dismiss", "Close")]
 
-    def __init__(self, remote_url: str):
+    def __init__(self, remote_url: str, qr: str | None = None):
         super().__init__()
         self._remote_url = remote_url
+        self._qr = qr
 
     def compose(self) -> ComposeResult:
         with Vertical(id="mobile-connect"):
             yield Label("Connect Mobile", id="mobile-title")
             yield Label(f"Open in iPhone: {self._remote_url}", id="mobile-url")
-            yield Static(_ascii_qr(self._remote_url), id="mobile-qr")
+            yield Static(self._qr or _ascii_qr(self._remote_url), id="mobile-qr")
             yield Button("Close", id="mobile-close", variant="primary")
 
     @on(Button.Pressed, "#mobile-close")
@@ -150,112 +225,13 @@ class ChromecastApp(App):
     """Terminal UI for casting media to Chromecast."""
 
     TITLE = "Chromecast TUI"
-    CSS = """
-    Screen {
-        layout: vertical;
-    }
-
-    /* Top panels */
-    #panels {
-        height: 1fr;
-        layout: horizontal;
-    }
-
-    #left-panel {
-        width: 35;
-        border: solid $panel-lighten-1;
-        padding: 0 1;
-    }
-
-    #right-panel {
-        width: 1fr;
-        border: solid $panel-lighten-1;
-        padding: 0 1;
-    }
-
-    #left-panel Label, #right-panel Label {
-        background: $panel;
-        color: $text;
-        width: 100%;
-        text-align: center;
-        margin-bottom: 1;
-    }
-
-    /* Device table */
-    #device-table {
-        height: 1fr;
-    }
-
-    /* Now playing */
-    NowPlayingBar {
-        height: 1;
-    }
-
-    /* Controls row */
-    #controls {
-        height: 5;
-        background: $panel;
-        padding: 1 2;
-        align: left middle;
-        layout: horizontal;
-    }
-
-    #controls Button {
-        margin: 0 1;
-        min-width: 5;
-    }
-
-    VolumeBar {
-        margin-left: 2;
-    }
-
-    #url-input {
-        margin-left: 2;
-        width: 1fr;
-    }
-
-    /* Status footer label */
-    #status-label {
-        height: 1;
-        background: $panel-darken-1;
-        color: $text;
-        padding: 0 1;
-        display: none;
-    }
-    #status-label.visible {
-        display: block;
-    }
-    #seek-preview-label {
-        height: 1;
-        padding: 0 1;
-        color: $text-muted;
-    }
-
-    /* Scan button */
-    #btn-scan {
-        margin-top: 1;
-        width: 100%;
-    }
-    #btn-mobile {
-        margin-top: 1;
-        width: 100%;
-    }
-    #filter-query {
-        margin-bottom: 1;
-        width: 100%;
-    }
-
-    /* Directory tree */
-    DirectoryTree {
-        height: 1fr;
-    }
-    """
+    CSS_PATH = "app.tcss"
 
     BINDINGS = [
         Binding("space", "toggle_play", "Play/Pause"),
         Binding("s", "stop", "Stop"),
         Binding("q", "quit", "Quit"),
-        Binding("r", "scan", "Scan"),
+        Binding("r", "scan(True)", "Scan"),
         Binding("c", "open_mobile", "Connect Mobile"),
         Binding("m", "toggle_mute", "Mute"),
         Binding("left", "seek_back", "« 10s"),
@@ -266,20 +242,55 @@ class ChromecastApp(App):
         Binding("down", "vol_down", "Vol -"),
     ]
 
-    # Reactives drive UI updates from the worker thread
-    _state: reactive[PlaybackState] = reactive(PlaybackState, recompose=False)
-    _status_msg: reactive[str] = reactive("")
-
     def __init__(self):
         super().__init__()
         self._server = MediaServer(on_remote_cast=self._on_remote_cast)
         self._cast = CastManager(on_state_change=self._on_cast_state)
-        self._devices: list[DeviceInfo] = []
-        self._visible_devices: list[DeviceInfo] = []
+        # Devices from the previous run fill the table until a scan replaces them
+        self._devices: list[DeviceInfo] = device_cache.load()
+        # (device, lowercased searchable text) for each entry in _devices
+        self._devices_lc: list[tuple[DeviceInfo, str]] = []
         self._selected_device: DeviceInfo | None = None
+        # Mirrors self._cast.connected; refreshed after every (re)connect so
+        # key repeats don't take the CastManager lock
+        self._connected = False
         self._filter_query: str = ""
-        self._control_lock = threading.Lock()
-        self._server.start()
+        self._filter_timer: Timer | None = None
+        self._control_lock = asyncio.Lock()
+        # action -> (handler, error if the value is missing; None = takes no value)
+        self._control_actions: dict[str, tuple[Callable, str | None]] = {
+            "play": (self._cast.play, None),
+            "pause": (self._cast.pause, None),
+            "stop": (self._cast.stop, None),
+            "toggle_mute": (self._cast.toggle_mute, None),
+            "seek": (self._cast.seek, "Missing seek target"),
+            "set_volume": (self._set_volume_if_changed, "Missing volume value"),
+        }
+        # Blocking control calls share these threads instead of starting a new
+        # one per action (connect/cast go through CastManager's own pool);
+        # scans get their own so a slow discovery never queues transport
+        # commands behind it
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tui-io")
+        self._scan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cast-scan")
+        self._last_seek_preview_t: float = 0.0
+        self._last_seek_preview_txt: str = ""
+        self._seek_preview_x: int | None = None
+        self._seek_preview_timer: Timer | None = None
+        self._last_state_key: tuple | None = None
+        self._last_btn_label = ""
+        self._status_clear_timer: Timer | None = None
+        self._mobile_qr: tuple[str, str] | None = None
+        self._status_counter = itertools.count(1)
+        self._status_token = 0
+        # Last volume the user asked for; CastManager only learns it once the
+        # RPC lands, so key repeats must build on this instead
+        self._volume_intent: float | None = None
+        self._pending_state: PlaybackState | None = None
+        self._state_flush_scheduled = False
+        self._state_lock = threading.Lock()
+        self._vol_timer: Timer | None = None
+        self._pending_seek: float | None = None
+        self._seek_timer: Timer | None = None
 
     # ------------------------------------------------------------------
     # Layout
@@ -300,10 +311,10 @@ class ChromecastApp(App):
             # Right: file browser
             with Vertical(id="right-panel"):
                 yield Label("[ Files ]")
-                yield DirectoryTree(str(Path.home()), id="file-tree")
+                yield MediaDirectoryTree(str(Path.home()), id="file-tree")
 
         yield NowPlayingBar(id="now-playing", markup=False)
-        yield ProgressBar(total=100, id="seek-bar", show_eta=False, show_percentage=False)
+        yield SeekBar(total=100, id="seek-bar", show_eta=False, show_percentage=False)
         yield Label("", id="seek-preview-label")
 
         # Controls
@@ -314,7 +325,7 @@ class ChromecastApp(App):
             yield Button("»", id="btn-ffw",  variant="default")
             yield Button("+30s", id="btn-ffw-30", variant="default")
             yield Button("+100s", id="btn-ffw-100", variant="default")
-            yield VolumeBar()
+            yield VolumeBar(int(self._cast.state.volume * 100))
             yield Input(placeholder="Seek: +30, -10, 1:23", id="seek-input")
             yield Button("Go", id="btn-seek-go", variant="default")
             yield Input(placeholder="Cast URL directly…", id="url-input")
@@ -323,49 +334,108 @@ class ChromecastApp(App):
         yield Footer()
 
     def on_mount(self) -> None:
+        # Resolve widgets once; handlers below run on hot paths
+        self._np_bar = self.query_one(NowPlayingBar)
+        self._seek_bar = self.query_one("#seek-bar", SeekBar)
+        self._seek_preview = self.query_one("#seek-preview-label", Label)
+        self._play_btn = self.query_one("#btn-play", Button)
+        self._status_label = self.query_one("#status-label", Label)
+        self._vol_input = self.query_one("#vol-input", Input)
+        self._seek_input = self.query_one("#seek-input", Input)
+        self._url_input = self.query_one("#url-input", Input)
+        self._device_table = self.query_one("#device-table", DataTable)
         # Set up device table columns
-        table = self.query_one("#device-table", DataTable)
-        table.add_columns("Name", "Model", "Type", "Host")
+        self._device_table.add_columns("Name", "Model", "Type", "Host")
+        self._populate_devices(self._devices)
+        # start() only spawns the server thread, so it doesn't delay the first paint
+        self._server.start()
         # Auto-scan on start
         self.action_scan()
-        self._set_status("Press 'c' for Connect Mobile", clear_after=5)
+        self._set_status_main("Press 'c' for Connect Mobile", clear_after=5)
 
     # ------------------------------------------------------------------
     # Device scanning
     # ------------------------------------------------------------------
 
-    @work(thread=True)
-    def action_scan(self) -> None:
-        self._set_status("Scanning network…")
+    def action_scan(self, force: bool = False) -> None:
+        if not force:
+            cached = self._cast.cached_devices()
+            if cached is not None:
+                self._populate_devices(cached)
+                return
+        self._scan_devices(force)
+
+    @work(group="scan")
+    async def _scan_devices(self, force: bool) -> None:
+        self._set_status_main("Scanning network…")
         try:
-            devices = self._cast.discover(timeout=5.0)
-            self.call_from_thread(self._populate_devices, devices)
-            msg = f"Found {len(devices)} device(s)" if devices else "No devices found"
-            self._set_status(msg, clear_after=3)
+            devices = await self._run_blocking(
+                self._cast.discover_iter,
+                lambda d: self.call_from_thread(self._append_device_row, d),
+                executor=self._scan_executor,
+                min_timeout=0.5,
+                max_timeout=2.0,
+                force=force,
+                known=list(self._devices),
+            )
         except Exception as e:
-            self._set_status(f"Scan error: {e}", clear_after=5)
+            self._set_status_main(f"Scan error: {e}", clear_after=5)
+            return
+        msg = f"Found {len(devices)} device(s)" if devices else "No devices found"
+        self._apply_scan_result(devices, msg)
+        if devices:
+            # Keep this network's cache fresh even if the app is killed later
+            await self._run_blocking(device_cache.save, devices, executor=self._scan_executor)
+
+    def _apply_scan_result(self, devices: list[DeviceInfo], msg: str) -> None:
+        # Table and status change in the same UI turn
+        self._populate_devices(devices)
+        self._set_status_main(msg, clear_after=3)
 
     def _populate_devices(self, devices: list[DeviceInfo]) -> None:
         self._devices = devices
-        self._refresh_visible_devices()
+        self._devices_lc = [(d, _search_text(d)) for d in devices]
+        # Rows of hosts seen before may carry stale names, so rebuild outright
+        self._refresh_visible_devices(rebuild=True)
+
+    def _append_device_row(self, device: DeviceInfo) -> None:
+        key = _row_key(device)
+        if any(_row_key(d) == key for d in self._devices):
+            return
+        self._devices.append(device)
+        text = _search_text(device)
+        self._devices_lc.append((device, text))
+        if self._matches_filter(text):
+            self._add_device_row(device)
+
+    def _add_device_row(self, device: DeviceInfo) -> None:
+        self._device_table.add_row(
+            device.name, device.model_name, device.backend, device.host, key=_row_key(device)
+        )
 
-    def _refresh_visible_devices(self) -> None:
+    def _matches_filter(self, text: str) -> bool:
         query = self._filter_query.strip().lower()
-        if not query or query == "all":
-            filtered = self._devices
-        else:
-            filtered = [
-                d for d in self._devices
-                if query in d.backend.lower()
-                or query in d.name.lower()
-                or query in d.model_name.lower()
-                or query in d.host.lower()
-            ]
-        self._visible_devices = filtered
-        table = self.query_one("#device-table", DataTable)
-        table.clear()
-        for d in filtered:
-            table.add_row(d.name, d.model_name, d.backend, d.host)
+        return not query or query == "all" or query in text
+
+    def _refresh_visible_devices(self, rebuild: bool = False) -> None:
+        """Sync the table with the filter, only adding and removing the rows that change."""
+        wanted = [d for d, text in self._devices_lc if self._matches_filter(text)]
+        keys = [_row_key(d) for d in wanted]
+        wanted_keys = set(keys)
+        table = self._device_table
+        kept = [k.value for k in table.rows if k.value in wanted_keys]
+        # add_row() can only append, so a row coming back mid-list forces a rebuild
+        appended = None if rebuild else _rows_to_append(kept, keys)
+        with self.batch_update():
+            if appended is None:
+                table.clear()
+                new_rows = wanted
+            else:
+                for key in [k for k in table.rows if k.value not in wanted_keys]:
+                    table.remove_row(key)
+                new_rows = wanted[len(wanted) - len(appended):]
+            for device in new_rows:
+                self._add_device_row(device)
 
     # ------------------------------------------------------------------
     # Device selection → connect
@@ -373,25 +443,37 @@ class ChromecastApp(App):
 
     @on(DataTable.RowSelected, "#device-table")
     def on_device_selected(self, event: DataTable.RowSelected) -> None:
-        idx = event.cursor_row
-        if idx < len(self._visible_devices):
-            self._selected_device = self._visible_devices[idx]
-            self._connect_to(self._selected_device)
+        key = event.row_key.value
+        device = next((d for d in self._devices if _row_key(d) == key), None)
+        if device is not None:
+            self._selected_device = device
+            self._connect_to(device)
 
     @on(Input.Changed, "#filter-query")
     def on_filter_query_changed(self, event: Input.Changed) -> None:
+        # Fast typing collapses into one table update
         self._filter_query = event.value
+        if self._filter_timer is not None:
+            self._filter_timer.stop()
+        self._filter_timer = self.set_timer(FILTER_DEBOUNCE, self._apply_filter)
+
+    def _apply_filter(self) -> None:
+        self._filter_timer = None
         self._refresh_visible_devices()
 
-    @work(thread=True)
-    def _connect_to(self, device: DeviceInfo) -> None:
-        self._set_status(f"Connecting to {device.name}…")
+    @work(group="connect")
+    async def _connect_to(self, device: DeviceInfo) -> None:
+        self._set_status_main(f"Connecting to {device.name}…")
+        self._connected = False
+        self._volume_intent = None
         try:
-            self._cast.connect(device)
-            self._set_status(f"Connected ✓ {device.name}", clear_after=3)
-            self.call_from_thread(self._update_title, device.name)
+            await asyncio.wrap_future(self._cast.aconnect(device))
+            self._set_status_main(f"Connected ✓ {device.name}", clear_after=3)
+            self._update_title(device.name)
         except Exception as e:
-            self._set_status(f"Connection failed: {e}", clear_after=6)
+            self._set_status_main(f"Connection failed: {e}", clear_after=6)
+        finally:
+            self._connected = self._cast.connected
 
     def _update_title(self, name: str) -> None:
         self.title = f"Chromecast TUI — {name}"
@@ -403,22 +485,26 @@ class ChromecastApp(App):
     @on(DirectoryTree.FileSelected, "#file-tree")
     def on_file_selected(self, event: DirectoryTree.FileSelected) -> None:
         path = event.path
-        if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            self._set_status(f"Unsupported format: {path.suffix}", clear_after=4)
+        suffix = path.suffix
+        if not suffix or suffix.lower() not in SUPPORTED_EXTENSIONS:
+            self._set_status_main(f"Unsupported format: {suffix}", clear_after=4)
             return
-        if not self._cast.connected:
-            self._set_status("Not connected to any device", clear_after=3)
+        if not self._connected:
+            self._set_status_main("Not connected to any device", clear_after=3)
             return
         self._cast_local_file(path)
 
-    @work(thread=True)
-    def _cast_local_file(self, path: Path) -> None:
+    @work(group="cast")
+    async def _cast_local_file(self, path: Path) -> None:
+        if not await self._run_blocking(self._server.wait_ready, timeout=3.0):
+            self._set_status_main("Media server is not running", clear_after=5)
+            return
         url = self._server.url_for(path)
-        self._set_status(f"Casting {path.name}…")
+        self._set_status_main(f"Casting {path.name}…")
         try:
-            self._cast.cast_file(path, server_url=url)
+            await asyncio.wrap_future(self._cast.acast_file(path, server_url=url))
         except Exception as e:
-            self._set_status(f"Cast error: {e}", clear_after=5)
+            self._set_status_main(f"Cast error: {e}", clear_after=5)
 
     # ------------------------------------------------------------------
     # URL input → cast remote URL
@@ -429,37 +515,31 @@ class ChromecastApp(App):
         url = event.value.strip()
         if not url:
             return
-        if not self._cast.connected:
-            self._set_status("Not connected to any device", clear_after=3)
+        if not self._connected:
+            self._set_status_main("Not connected to any device", clear_after=3)
             return
         self._cast_remote_url(url)
 
-    @work(thread=True)
-    def _cast_remote_url(self, url: str) -> None:
-        # Guess content type from URL
-        import mimetypes
-        mime, _ = mimetypes.guess_type(url)
-        if not mime:
-            mime = "video/mp4"
-        self._set_status(f"Casting URL…")
+    @work(group="cast")
+    async def _cast_remote_url(self, url: str) -> None:
+        mime = _guess_mime(url)
+        self._set_status_main(f"Casting URL…")
         try:
-            self._cast.cast_url(url, mime)
-            self.call_from_thread(self.query_one("#url-input", Input).clear)
+            await asyncio.wrap_future(self._cast.acast_url(url, mime))
+            self._url_input.clear()
         except Exception as e:
-            self._set_status(f"Cast error: {e}", clear_after=5)
+            self._set_status_main(f"Cast error: {e}", clear_after=5)
 
     def _on_remote_cast(self, url: str, title: str = "") -> None:
-        if not self._cast.connected:
+        if not self._connected:
             raise RuntimeError("No device connected in TUI")
-        mime, _ = mimetypes.guess_type(url)
-        if not mime:
-            mime = "video/mp4"
+        mime = _guess_mime(url)
         try:
             self._cast.cast_url(url, mime, title=title)
             shown = title or url
-            self._set_status(f"Remote casting: {shown}", clear_after=4)
+            self._set_status_thread(f"Remote casting: {shown}", clear_after=4)
         except Exception as e:
-            self._set_status(f"Remote cast error: {e}", clear_after=5)
+            self._set_status_thread(f"Remote cast error: {e}", clear_after=5)
             raise
 
     # ------------------------------------------------------------------
@@ -470,8 +550,8 @@ class ChromecastApp(App):
     def on_volume_submitted(self, event: Input.Submitted) -> None:
         try:
             level = int(event.value) / 100.0
-            if self._cast.connected:
-                self._cast.set_volume(level)
+            if self._connected:
+                self._queue_volume(max(0.0, min(1.0, level)))
         except ValueError:
             pass
 
@@ -505,7 +585,7 @@ class ChromecastApp(App):
 
     @on(Button.Pressed, "#btn-scan")
     def on_btn_scan(self) -> None:
-        self.action_scan()
+        self.action_scan(force=True)
 
     @on(Button.Pressed, "#btn-mobile")
     def on_btn_mobile(self) -> None:
@@ -521,7 +601,7 @@ class ChromecastApp(App):
 
     @on(events.Click, "#seek-bar")
     def on_seek_bar_click(self, event: events.Click) -> None:
-        if not self._cast.connected:
+        if not self._connected:
             return
         duration = self._cast.state.duration or 0.0
         if duration <= 0:
@@ -533,201 +613,321 @@ class ChromecastApp(App):
 
     @on(events.MouseMove, "#seek-bar")
     def on_seek_bar_move(self, event: events.MouseMove) -> None:
-        if not self._cast.connected:
+        if not self._connected:
             return
-        duration = self._cast.state.duration or 0.0
-        if duration <= 0:
+        if (self._cast.state.duration or 0.0) <= 0:
             return
-        target = self._seek_target_from_bar_x(event.x)
+        self._seek_preview_x = event.x
+        wait = self._last_seek_preview_t + SEEK_PREVIEW_INTERVAL - time.monotonic()
+        if wait > 0:
+            # Too soon; show wherever the pointer is when the interval ends
+            if self._seek_preview_timer is None:
+                self._seek_preview_timer = self.set_timer(wait, self._flush_seek_preview)
+            return
+        self._render_seek_preview()
+
+    def _flush_seek_preview(self) -> None:
+        self._seek_preview_timer = None
+        if self._seek_preview_x is not None:
+            self._render_seek_preview()
+
+    def _render_seek_preview(self) -> None:
+        target = self._seek_target_from_bar_x(self._seek_preview_x)
         if target is None:
             return
-        self.query_one("#seek-preview-label", Label).update(
-            f" Seek preview: {_fmt_time(target)} / {_fmt_time(duration)}"
-        )
+        duration = self._cast.state.duration
+        self._last_seek_preview_t = time.monotonic()
+        text = f" Seek preview: {_fmt_time(target)} / {_fmt_time(duration)}"
+        if text == self._last_seek_preview_txt:
+            return
+        self._last_seek_preview_txt = text
+        self._seek_preview.update(text)
 
     @on(events.Leave, "#seek-bar")
     def on_seek_bar_leave(self) -> None:
-        self.query_one("#seek-preview-label", Label).update("")
+        if self._seek_preview_timer is not None:
+            self._seek_preview_timer.stop()
+            self._seek_preview_timer = None
+        self._seek_preview_x = None
+        self._last_seek_preview_txt = ""
+        self._seek_preview.update("")
 
     def _submit_seek_input(self, value: str | None = None) -> None:
-        if not self._cast.connected:
-            self._set_status("Not connected to any device", clear_after=3)
+        if not self._connected:
+            self._set_status_main("Not connected to any device", clear_after=3)
             return
-        seek_input = self.query_one("#seek-input", Input)
+        seek_input = self._seek_input
         raw = (value if value is not None else seek_input.value).strip()
         if not raw:
             return
         target = _parse_seek_target(raw, self._cast.state.current_time, self._cast.state.duration)
         if target is None:
-            self._set_status("Invalid seek format", clear_after=3)
+            self._set_status_main("Invalid seek format", clear_after=3)
             return
         self._run_control_action("seek", target)
-        self.call_from_thread(seek_input.clear)
+        seek_input.clear()
 
     def _seek_target_from_bar_x(self, x: int) -> float | None:
         duration = self._cast.state.duration or 0.0
         if duration <= 0:
             return None
-        bar = self.query_one("#seek-bar", ProgressBar)
-        width = max(1, bar.size.width)
-        pos = max(0, min(x, width - 1))
-        ratio = pos / max(1, width - 1)
-        return duration * ratio
+        bar = self._seek_bar
+        last_x = bar.last_x
+        pos = 0 if x <= 0 else (last_x if x >= last_x else x)
+        return duration * pos / bar.div
 
     # ------------------------------------------------------------------
     # Keybinding actions
     # ------------------------------------------------------------------
 
     def action_toggle_play(self) -> None:
-        if self._cast.connected:
+        if self._connected:
             if self._cast.state.status == "playing":
                 self._run_control_action("pause")
             else:
                 self._run_control_action("play")
 
     def action_stop(self) -> None:
-        if self._cast.connected:
+        if self._connected:
             self._run_control_action("stop")
 
     def action_toggle_mute(self) -> None:
-        if self._cast.connected:
+        if self._connected:
             self._run_control_action("toggle_mute")
 
     def action_seek_back(self) -> None:
-        if self._cast.connected:
+        if self._connected:
             self._seek_relative(-10)
 
     def action_seek_fwd(self) -> None:
-        if self._cast.connected:
+        if self._connected:
             self._seek_relative(10)
 
     def action_seek_fwd_30(self) -> None:
-        if self._cast.connected:
+        if self._connected:
             self._seek_relative(30)
 
     def action_seek_fwd_100(self) -> None:
-        if self._cast.connected:
+        if self._connected:
             self._seek_relative(100)
 
     def action_open_mobile(self) -> None:
-        self.push_screen(MobileConnectScreen(self._server.remote_url()))
+        url = self._server.remote_url()
+        if self._mobile_qr is not None and self._mobile_qr[0] == url:
+            self.push_screen(MobileConnectScreen(url, self._mobile_qr[1]))
+            return
+        self._open_mobile(url)
+
+    @work(group="mobile", exclusive=True)
+    async def _open_mobile(self, url: str) -> None:
+        # QR encoding is slow enough to stall the UI, so do it off-thread once per URL
+        self._set_status_main("Preparing QR…")
+        qr = await self._run_blocking(_ascii_qr, url)
+        self._mobile_qr = (url, qr)
+        self._set_status_main("")
+        self.push_screen(MobileConnectScreen(url, qr))
 
     def _seek_relative(self, delta_seconds: float) -> None:
-        target = max(0.0, self._cast.state.current_time + delta_seconds)
-        self._run_control_action("seek", target)
+        """Accumulate repeated seek presses and send one seek for the total."""
+        base = self._pending_seek
+        if base is None:
+            base = self._cast.state.current_time
+        target = max(0.0, base + delta_seconds)
+        self._pending_seek = target
+        # Move the bar right away; the device catches up after the debounce
+        duration = self._cast.state.duration
+        if duration > 0:
+            self._seek_bar.update(progress=min(target, duration))
+        if self._seek_timer is not None:
+            self._seek_timer.stop()
+        self._seek_timer = self.set_timer(SEEK_DEBOUNCE, self._flush_seek)
+
+    def _flush_seek(self) -> None:
+        self._seek_timer = None
+        target, self._pending_seek = self._pending_seek, None
+        if target is not None:
+            self._run_control_action("seek", target)
 
     def action_vol_up(self) -> None:
-        if self._cast.connected:
-            target = min(1.0, self._cast.state.volume + 0.05)
-            self._run_control_action("set_volume", target)
-            self._sync_vol_input()
+        if self._connected:
+            self._queue_volume(min(1.0, self._current_volume() + 0.05))
 
     def action_vol_down(self) -> None:
-        if self._cast.connected:
-            target = max(0.0, self._cast.state.volume - 0.05)
-            self._run_control_action("set_volume", target)
-            self._sync_vol_input()
+        if self._connected:
+            self._queue_volume(max(0.0, self._current_volume() - 0.05))
+
+    def _current_volume(self) -> float:
+        if self._volume_intent is not None:
+            return self._volume_intent
+        return self._cast.state.volume
 
-    @work(thread=True)
-    def _run_control_action(self, action: str, value: float | None = None) -> None:
-        with self._control_lock:
+    def _queue_volume(self, target: float) -> None:
+        """Coalesce a burst of volume presses into one RPC at the final value."""
+        if abs(target - self._current_volume()) < 1e-3:
+            return
+        self._volume_intent = target
+        self._sync_vol_input(target)
+        if self._vol_timer is None:
+            self._vol_timer = self.set_timer(VOLUME_FLUSH_INTERVAL, self._flush_volume)
+
+    def _flush_volume(self) -> None:
+        self._vol_timer = None
+        if self._volume_intent is not None:
+            self._apply_volume(self._volume_intent)
+
+    @work(group="control")
+    async def _apply_volume(self, target: float) -> None:
+        await self._control(action="set_volume", value=target)
+        # Once applied, later presses build on the device's volume again (it
+        # may change elsewhere); unless a newer press is already queued
+        if self._volume_intent == target:
+            self._volume_intent = None
+
+    @work(group="control")
+    async def _run_control_action(self, action: str, value: float | None = None) -> None:
+        await self._control(action, value)
+
+    async def _control(self, action: str, value: float | None = None) -> None:
+        # Blocking device RPCs run in a thread; the lock keeps them in order
+        async with self._control_lock:
             try:
-                self._execute_control_action(action, value)
+                await self._run_blocking(self._execute_control_action, action, value)
                 return
             except Exception as e:
-                if self._is_connection_error(e) and self._attempt_reconnect():
+                if self._is_connection_error(e) and await self._run_blocking(self._attempt_reconnect):
                     try:
-                        self._execute_control_action(action, value)
+                        await self._run_blocking(self._execute_control_action, action, value)
                         return
                     except Exception as retry_error:
-                        self._set_status(f"Control error: {retry_error}", clear_after=4)
+                        self._set_status_main(f"Control error: {retry_error}", clear_after=4)
                         return
-                self._set_status(f"Control error: {e}", clear_after=4)
+                self._set_status_main(f"Control error: {e}", clear_after=4)
+
+    async def _run_blocking(self, fn, *args, executor: ThreadPoolExecutor | None = None, **kwargs):
+        """Run a blocking CastManager/MediaServer call on a worker pool (shared one by default)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self._executor, partial(fn, *args, **kwargs))
 
     def _execute_control_action(self, action: str, value: float | None = None) -> None:
-        if action == "play":
-            self._cast.play()
-        elif action == "pause":
-            self._cast.pause()
-        elif action == "stop":
-            self._cast.stop()
-        elif action == "toggle_mute":
-            self._cast.toggle_mute()
-        elif action == "seek":
-            if value is None:
-                raise ValueError("Missing seek target")
-            self._cast.seek(value)
-        elif action == "set_volume":
-            if value is None:
-                raise ValueError("Missing volume value")
-            self._cast.set_volume(value)
+        entry = self._control_actions.get(action)
+        if entry is None:
+            return
+        fn, missing = entry
+        if missing is None:
+            fn()
+            return
+        if value is None:
+            raise ValueError(missing)
+        fn(value)
+
+    def _set_volume_if_changed(self, value: float) -> None:
+        if abs(value - self._cast.state.volume) < 1e-3:
+            return
+        self._cast.set_volume(value)
 
     def _attempt_reconnect(self) -> bool:
         if not self._selected_device:
             return False
         device = self._selected_device
-        self._set_status(f"Reconnecting to {device.name}…")
+        self._set_status_thread(f"Reconnecting to {device.name}…")
+        self._connected = False
+        self._volume_intent = None
         try:
             self._cast.connect(device)
-            self._set_status(f"Reconnected ✓ {device.name}", clear_after=2)
+            self._set_status_thread(f"Reconnected ✓ {device.name}", clear_after=2)
             return True
         except Exception as e:
-            self._set_status(f"Reconnect failed: {e}", clear_after=4)
+            self._set_status_thread(f"Reconnect failed: {e}", clear_after=4)
             return False
+        finally:
+            self._connected = self._cast.connected
 
     def _is_connection_error(self, error: Exception) -> bool:
-        text = str(error).lower()
-        markers = (
-            "not connected",
-            "connection",
-            "timeout",
-            "socket",
-            "broken pipe",
-            "reset by peer",
-            "transport",
-        )
-        return any(m in text for m in markers)
+        return _CONN_ERR_RE.search(str(error)) is not None
 
-    def _sync_vol_input(self) -> None:
-        pct = int(self._cast.state.volume * 100)
-        self.query_one("#vol-input", Input).value = str(pct)
+    def _sync_vol_input(self, level: float | None = None) -> None:
+        if level is None:
+            level = self._cast.state.volume
+        text = str(int(level * 100))
+        if self._vol_input.value != text:
+            self._vol_input.value = text
 
     # ------------------------------------------------------------------
     # State callbacks (from background thread)
     # ------------------------------------------------------------------
 
     def _on_cast_state(self, state: PlaybackState) -> None:
-        """pychromecast calls this from its own thread → marshal to UI thread."""
-        self.call_from_thread(self._apply_state, state)
+        """pychromecast calls this from its own thread; bursts are flushed together."""
+        # Sub-second ticks change nothing on screen, so they never reach the UI thread
+        key = (state.status, int(state.current_time), int(state.duration), state.title)
+        with self._state_lock:
+            if key == self._last_state_key:
+                return
+            self._last_state_key = key
+            self._pending_state = state
+            if self._state_flush_scheduled:
+                return
+            self._state_flush_scheduled = True
+        try:
+            self.call_from_thread(self.set_timer, STATE_FLUSH_DELAY, self._flush_state)
+        except Exception:
+            # Nothing was scheduled (e.g. the app is shutting down); let the
+            # next update try again rather than dropping every later one
+            with self._state_lock:
+                self._state_flush_scheduled = False
+                self._last_state_key = None
+            raise
+
+    def _flush_state(self) -> None:
+        with self._state_lock:
+            state, self._pending_state = self._pending_state, None
+            self._state_flush_scheduled = False
+        if state is not None:
+            self._apply_state(state)
 
     def _apply_state(self, state: PlaybackState) -> None:
-        self.query_one(NowPlayingBar).update_state(state)
-        bar = self.query_one("#seek-bar", ProgressBar)
         total = state.duration if state.duration > 0 else 100.0
         progress = min(state.current_time, state.duration) if state.duration > 0 else 0.0
-        bar.update(progress=progress, total=total)
-        # Update play button label
-        btn = self.query_one("#btn-play", Button)
-        btn.label = "⏸" if state.status == "playing" else "▶"
+        label = "⏸" if state.status == "playing" else "▶"
+        # All three widgets land in the same frame
+        with self.batch_update():
+            self._np_bar.update_state(state)
+            self._seek_bar.update(progress=progress, total=total)
+            # Relabel the play button only on a play/pause transition
+            if label != self._last_btn_label:
+                self._last_btn_label = label
+                self._play_btn.label = label
 
     # ------------------------------------------------------------------
     # Status messages
     # ------------------------------------------------------------------
 
-    def _set_status(self, msg: str, clear_after: float = 0) -> None:
-        if threading.current_thread() is threading.main_thread():
-            self._show_status(msg)
-        else:
-            self.call_from_thread(self._show_status, msg)
+    def _set_status_main(self, msg: str, clear_after: float = 0) -> None:
+        """Show a status message; must be called on the UI thread."""
+        # A newer message always cancels the pending clear of an older one;
+        # the token also stops a clear that already fired from wiping it
+        token = self._status_token = next(self._status_counter)
+        if self._status_clear_timer is not None:
+            self._status_clear_timer.stop()
+            self._status_clear_timer = None
+        self._show_status(msg)
         if clear_after:
-            def _clear():
-                import time
-                time.sleep(clear_after)
-                self.call_from_thread(self._show_status, "")
-            threading.Thread(target=_clear, daemon=True).start()
+            self._status_clear_timer = self.set_timer(
+                clear_after, partial(self._clear_status, token)
+            )
+
+    def _set_status_thread(self, msg: str, clear_after: float = 0) -> None:
+        """Show a status message from a worker or library thread."""
+        self.call_from_thread(self._set_status_main, msg, clear_after)
+
+    def _clear_status(self, token: int) -> None:
+        if token != self._status_token:
+            return
+        self._status_clear_timer = None
+        self._show_status("")
 
     def _show_status(self, msg: str) -> None:
-        label = self.query_one("#status-label", Label)
+        label = self._status_label
         if msg:
             label.update(f" {msg}")
             label.add_class("visible")
@@ -746,59 +946,82 @@ class ChromecastApp(App):
             except Exception:
                 pass
         self._cast.disconnect()
-        self._server.stop()
+        self._cast.shutdown()
+        self._server.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._scan_executor.shutdown(wait=False, cancel_futures=True)
+        if self._devices:
+            device_cache.save(self._devices)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────────────
 
+def _search_text(device: DeviceInfo) -> str:
+    # NUL-separated so a query can't match across two fields
+    return "\0".join((device.backend, device.name, device.model_name, device.host)).lower()
+
+
+def _row_key(device: DeviceInfo) -> str:
+    # Host alone isn't unique: a cast group answers on its leader's IP
+    return f"{device.host}:{device.port}"
+
+
+def _rows_to_append(shown: list[str], wanted: list[str]) -> list[str] | None:
+    """Row keys to append so rows `shown` become `wanted`, in order.
+
+    None when that takes more than appending, i.e. the table must be rebuilt.
+    """
+    if shown != wanted[: len(shown)]:
+        return None
+    return wanted[len(shown):]
+
+
 def _fmt_time(seconds: float) -> str:
-    if not seconds:
-        return "0:00"
-    m, s = divmod(int(seconds), 60)
+    return "0:00" if not seconds else _fmt_time_int(int(seconds))
+
+
+@lru_cache(maxsize=4096)
+def _fmt_time_int(seconds: int) -> str:
+    m, s = divmod(seconds, 60)
     h, m = divmod(m, 60)
     if h:
         return f"{h}:{m:02d}:{s:02d}"
     return f"{m}:{s:02d}"
 
 
+def _guess_mime(url: str) -> str:
+    # Guess from the path alone so query strings neither hide the extension
+    # nor make otherwise identical URLs miss the cache
+    return _mime_for_suffix(posixpath.splitext(urlsplit(url).path)[1].lower())
+
+
+@lru_cache(maxsize=256)
+def _mime_for_suffix(suffix: str) -> str:
+    mime, _ = mimetypes.guess_type(f"file{suffix}")
+    return mime or "video/mp4"
+
+
+_NUM = r"(?:\d+(?:\.\d*)?|\.\d+)"
+_SEEK_RE = re.compile(
+    rf"^\s*(?:(?P<delta>[+-]{_NUM})|(?:(?P<h>\d+):)?(?P<m>\d+):(?P<s>\d+)|(?P<abs>{_NUM}))\s*$"
+)
+
+
 def _parse_seek_target(raw: str, current_time: float, duration: float) -> float | None:
-    text = raw.strip()
-    if not text:
+    """Parse `+N` / `-N` (relative), `M:S`, `H:M:S` or bare seconds into a target."""
+    m = _SEEK_RE.match(raw)
+    if m is None:
         return None
 
-    target: float | None = None
-    if text[0] in {"+", "-"}:
-        try:
-            delta = float(text)
-        except ValueError:
-            return None
-        target = current_time + delta
-    elif ":" in text:
-        parts = text.split(":")
-        if len(parts) == 2:
-            try:
-                m = int(parts[0])
-                s = int(parts[1])
-            except ValueError:
-                return None
-            target = float(m * 60 + s)
-        elif len(parts) == 3:
-            try:
-                h = int(parts[0])
-                m = int(parts[1])
-                s = int(parts[2])
-            except ValueError:
-                return None
-            target = float(h * 3600 + m * 60 + s)
-        else:
-            return None
+    delta, secs = m.group("delta", "s")
+    if delta is not None:
+        target = current_time + float(delta)
+    elif secs is not None:
+        target = float(int(m.group("h") or 0) * 3600 + int(m.group("m")) * 60 + int(secs))
     else:
-        try:
-            target = float(text)
-        except ValueError:
-            return None
+        target = float(m.group("abs"))
 
     target = max(0.0, target)
     if duration and duration > 0:
@@ -806,13 +1029,14 @@ def _parse_seek_target(raw: str, current_time: float, duration: float) -> float
     return target
 
 
+_QR_CELLS = ("  ", "██")
+
+
+@lru_cache(maxsize=8)
 def _ascii_qr(text: str) -> str:
+    # The remote URL rarely changes, so reopening the modal reuses the block
     qr = qrcode.QRCode(border=4)
     qr.add_data(text)
     qr.make(fit=True)
-    matrix = qr.get_matrix()
-    lines = []
-    for row in matrix:
-        line = "".join("██" if cell else "  " for cell in row)
-        lines.append(line)
-    return "\n".join(lines)
+    cells = _QR_CELLS
+    return "\n".join("".join([cells[cell] for cell in row]) for row in qr.get_matrix())
@@ -3,14 +3,21 @@ Chromecast discovery and control wrapper around pychromecast.
 All blocking calls run in a thread pool so they don't freeze the TUI.
 """
 
+import http.client
 import mimetypes
+import re
+import select
+import selectors
 import socket
 import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Callable
 import xml.etree.ElementTree as ET
-from urllib.parse import quote_plus
+from urllib.parse import quote_plus, urlsplit
 from urllib.request import Request, urlopen
 
 import pychromecast
@@ -18,17 +25,40 @@ from pychromecast import Chromecast
 from pychromecast.controllers.media import MediaStatus, MediaStatusListener
 
 
-SUPPORTED_EXTENSIONS = {
+SUPPORTED_EXTENSIONS: frozenset[str] = frozenset({
     # Video
     ".mp4", ".webm", ".mkv", ".avi", ".mov", ".m4v",
     # Audio
     ".mp3", ".flac", ".wav", ".ogg", ".opus", ".aac", ".m4a",
     # Image
     ".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp",
+})
+
+# How long a discovery result stays valid before the network is scanned again.
+DISCOVERY_CACHE_TTL = 30.0
+
+# pychromecast player_state -> PlaybackState.status
+_PLAYER_STATE_MAP = {
+    "PLAYING": "playing",
+    "PAUSED": "paused",
+    "BUFFERING": "buffering",
+    "IDLE": "idle",
 }
 
+_SSDP_ADDR = ("239.255.255.250", 1900)
+# When each SSDP M-SEARCH goes out, relative to the start of the scan.
+_SSDP_SEND_OFFSETS = (0.0, 0.1, 0.3)
+_LOCATION_RE = re.compile(rb"^location:[ \t]*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+# Timeout for the direct TCP/HTTP probes of known and ARP-neighbour hosts.
+PROBE_TIMEOUT = 0.5
+
+# A Roku connection idle longer than this is reopened before the next request
+# instead of risking a send on a socket the Roku has already dropped.
+ROKU_IDLE_REOPEN = 4.0
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class DeviceInfo:
     name: str
     host: str
@@ -38,7 +68,7 @@ class DeviceInfo:
     backend: str = "chromecast"
 
 
-@dataclass
+@dataclass(slots=True)
 class PlaybackState:
     status: str = "idle"          # idle | playing | paused | buffering
     title: str = ""
@@ -53,71 +83,198 @@ class PlaybackState:
 class CastManager:
     """Manages a single active Chromecast connection."""
 
-    def __init__(self, on_state_change: Callable[[PlaybackState], None] | None = None):
+    # Flip once _discover_airplay/_connect_airplay do something.
+    _AIRPLAY_ENABLED = False
+
+    def __init__(
+        self,
+        on_state_change: Callable[[PlaybackState], None] | None = None,
+        cache_ttl: float = DISCOVERY_CACHE_TTL,
+    ):
         self._cast: Chromecast | None = None
         self._browser = None
         self._lock = threading.Lock()
         self._on_state_change = on_state_change
         self.state = PlaybackState()
-        self._active_backend = "chromecast"
+        # Controls go to whichever of these matches the connected device
+        self._chromecast_backend = _ChromecastBackend(self)
+        self._roku_backend = _RokuBackend(self)
+        self._backend: _ChromecastBackend | _RokuBackend = self._chromecast_backend
         self._roku_device: DeviceInfo | None = None
+        # Kept-alive ECP connection to the connected Roku; requests on it are
+        # serialized by _roku_http_lock
+        self._roku_conn: http.client.HTTPConnection | None = None
+        self._roku_http_lock = threading.Lock()
+        self._roku_last_used = 0.0
         self._airplay_device: DeviceInfo | None = None
+        self._cache_ttl = cache_ttl
+        # (monotonic timestamp, network key, devices) of the last scan
+        self._scan_cache: tuple[float, str, list[DeviceInfo]] | None = None
+        # Pool for the a*() helpers; created on first use, ended by shutdown()
+        self._pool: ThreadPoolExecutor | None = None
+        # A reconnect from one thread mustn't interleave with a connect from another
+        self._connect_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Discovery
     # ------------------------------------------------------------------
 
-    def discover(self, timeout: float = 5.0) -> list[DeviceInfo]:
-        """Scan the network and return found Chromecast devices."""
+    def discover(self, timeout: float = 5.0, force: bool = False) -> list[DeviceInfo]:
+        """
+        Scan the network and return found devices.
+
+        Results are cached for `cache_ttl` seconds per local network; pass
+        `force=True` to ignore the cache and always scan.
+        """
+        if not force:
+            cached = self.cached_devices()
+            if cached is not None:
+                return cached
+        devices = self._scan(timeout)
+        self._scan_cache = (time.monotonic(), network_key(), devices)
+        return list(devices)
+
+    def cached_devices(self) -> list[DeviceInfo] | None:
+        """Return the last scan result if still fresh for this network, else None."""
+        cached = self._scan_cache
+        if cached is None:
+            return None
+        ts, key, devices = cached
+        if time.monotonic() - ts >= self._cache_ttl or key != network_key():
+            return None
+        return list(devices)
+
+    def discover_iter(
+        self,
+        callback: Callable[[DeviceInfo], None],
+        min_timeout: float = 0.5,
+        max_timeout: float = 2.0,
+        force: bool = False,
+        known: list[DeviceInfo] | None = None,
+    ) -> list[DeviceInfo]:
+        """
+        Scan the network, calling `callback` for each device as it answers.
+
+        mDNS browsing runs alongside three direct probes: Roku SSDP, the
+        `known` devices from a previous run, and hosts in the ARP table that
+        accept connections on the cast port. Each host and port is reported
+        once, so a cast group sharing its leader's IP still shows up.
+
+        Waits in windows starting at `min_timeout`: an empty window doubles
+        the next one while nothing has been found yet, and ends the scan once
+        at least one device is known, whether or not every probe has finished.
+        `max_timeout` is a hard cap.
+        """
+        if not force:
+            cached = self.cached_devices()
+            if cached is not None:
+                for device in cached:
+                    callback(device)
+                return cached
+
+        known = known or []
         devices: list[DeviceInfo] = []
-        chromecasts, browser = pychromecast.get_chromecasts(timeout=timeout)
-        pychromecast.stop_discovery(browser)
-        for cc in chromecasts:
-            cast_info = getattr(cc, "cast_info", None)
-            devices.append(DeviceInfo(
-                name=(
-                    getattr(cc, "name", None)
-                    or getattr(cast_info, "friendly_name", None)
-                    or "Unknown Chromecast"
-                ),
-                host=(
-                    getattr(cc, "host", None)
-                    or getattr(cast_info, "host", None)
-                    or ""
-                ),
-                port=(
-                    getattr(cc, "port", None)
-                    or getattr(cast_info, "port", None)
-                    or 8009
-                ),
-                model_name=(
-                    getattr(cc, "model_name", None)
-                    or getattr(cast_info, "model_name", None)
-                    or "Chromecast"
-                ),
-                cast_type=(
-                    getattr(cc, "cast_type", None)
-                    or getattr(cast_info, "cast_type", None)
-                    or "cast"
-                ),
-                backend="chromecast",
-            ))
-        try:
-            devices.extend(self._discover_roku(timeout=min(2.0, timeout)))
-        except Exception:
-            pass
+        seen: set[tuple[str, int]] = set()
+        seen_lock = threading.Lock()
+        arrived = threading.Event()
+        closed = False
+
+        def _add(device: DeviceInfo) -> None:
+            # Probes still running after the scan returns are ignored, so every
+            # reported device is also in the returned (and cached) list
+            with seen_lock:
+                key = (device.host, device.port)
+                if closed or key in seen:
+                    return
+                seen.add(key)
+                devices.append(device)
+                callback(device)
+            arrived.set()
+
+        def _roku() -> None:
+            for device in self._discover_roku(timeout=min(2.0, max_timeout), on_device=_add):
+                _add(device)
+
+        def _known_rokus() -> None:
+            for device in known:
+                if device.backend == "roku":
+                    info = self._roku_device_info(device.host, timeout=PROBE_TIMEOUT)
+                    if info is not None:
+                        _add(info)
+
+        def _arp() -> None:
+            skip = {d.host for d in known}
+            for device in self._probe_arp(skip, on_device=_add):
+                _add(device)
+
+        # pychromecast polls known hosts directly, in parallel with mDNS.
+        browser = pychromecast.get_chromecasts(
+            blocking=False,
+            callback=lambda cc: _add(_device_from_chromecast(cc)),
+            known_hosts=[d.host for d in known if d.backend == "chromecast"] or None,
+        )
+        pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="discovery")
+        for probe in (_roku, _known_rokus, _arp):
+            pool.submit(probe)
         try:
-            devices.extend(self._discover_airplay(timeout=min(2.0, timeout)))
-        except Exception:
-            pass
+            deadline = time.monotonic() + max_timeout
+            interval = min_timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if arrived.wait(min(interval, remaining)):
+                    arrived.clear()
+                    continue
+                if devices:
+                    break
+                interval = min(interval * 2, max_timeout)
+        finally:
+            with seen_lock:
+                closed = True
+            pychromecast.stop_discovery(browser)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        found = list(devices)
+        self._scan_cache = (time.monotonic(), network_key(), found)
+        return list(found)
+
+    def _scan(self, timeout: float) -> list[DeviceInfo]:
+        # Each backend waits on its own sockets, so run them side by side;
+        # the scan then takes as long as the slowest one, not the sum
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="discovery") as pool:
+            chromecasts = pool.submit(self._discover_chromecasts, timeout)
+            extras = [pool.submit(self._discover_roku, min(2.0, timeout))]
+            if self._AIRPLAY_ENABLED:
+                extras.append(pool.submit(self._discover_airplay, min(2.0, timeout)))
+        devices = chromecasts.result()
+        for future in extras:
+            try:
+                devices.extend(future.result())
+            except Exception:
+                pass
         return devices
 
+    def _discover_chromecasts(self, timeout: float) -> list[DeviceInfo]:
+        chromecasts, browser = pychromecast.get_chromecasts(timeout=timeout)
+        pychromecast.stop_discovery(browser)
+        return [_device_from_chromecast(cc) for cc in chromecasts]
+
     # ------------------------------------------------------------------
     # Connection
     # ------------------------------------------------------------------
 
     def connect(self, device: DeviceInfo, timeout: float = 10.0) -> None:
         """Connect (and wait) to the given device."""
+        with self._connect_lock:
+            try:
+                self._connect(device, timeout)
+            except Exception:
+                # The device may have left the network; don't offer it again from cache
+                self._scan_cache = None
+                raise
+
+    def _connect(self, device: DeviceInfo, timeout: float) -> None:
         self.disconnect()
         if device.backend == "roku":
             self._connect_roku(device, timeout=timeout)
@@ -141,13 +298,15 @@ class CastManager:
         with self._lock:
             self._cast = cast
             self._browser = browser
-            self._active_backend = "chromecast"
+            self._backend = self._chromecast_backend
             self._roku_device = None
             self._airplay_device = None
 
-        # Sync initial volume
-        self.state.volume = cast.status.volume_level if cast.status else 1.0
-        self.state.is_muted = cast.status.volume_muted if cast.status else False
+        # Sync initial volume; without a status the defaults from disconnect() stand
+        status = cast.status
+        if status:
+            self.state.volume = status.volume_level
+            self.state.is_muted = status.volume_muted
 
     def disconnect(self) -> None:
         with self._lock:
@@ -163,30 +322,63 @@ class CastManager:
                 except Exception:
                     pass
                 self._browser = None
+            if self._roku_conn:
+                self._roku_conn.close()
+                self._roku_conn = None
             self._roku_device = None
             self._airplay_device = None
-            self._active_backend = "chromecast"
+            self._backend = self._chromecast_backend
         self.state = PlaybackState()
 
     @property
     def connected(self) -> bool:
-        with self._lock:
-            return (
-                self._cast is not None
-                or self._roku_device is not None
-                or self._airplay_device is not None
-            )
+        # Plain attribute reads are atomic; the lock only guards mutation.
+        return (
+            self._cast is not None
+            or self._roku_device is not None
+            or self._airplay_device is not None
+        )
 
     @property
     def device_name(self) -> str:
+        # Read each field once so a concurrent disconnect can't None it mid-check.
+        cast, roku, airplay = self._cast, self._roku_device, self._airplay_device
+        if cast:
+            return cast.name
+        if roku:
+            return roku.name
+        if airplay:
+            return airplay.name
+        return ""
+
+    # ------------------------------------------------------------------
+    # Non-blocking variants, run on the manager's cast-io pool
+    # ------------------------------------------------------------------
+
+    def adiscover(self, timeout: float = 5.0, force: bool = False) -> Future[list[DeviceInfo]]:
+        return self._submit(self.discover, timeout, force)
+
+    def aconnect(self, device: DeviceInfo, timeout: float = 10.0) -> Future[None]:
+        return self._submit(self.connect, device, timeout)
+
+    def acast_file(self, file_path: str | Path, server_url: str, title: str = "") -> Future[None]:
+        return self._submit(self.cast_file, file_path, server_url, title)
+
+    def acast_url(self, url: str, content_type: str, title: str = "") -> Future[None]:
+        return self._submit(self.cast_url, url, content_type, title)
+
+    def shutdown(self) -> None:
+        """Stop the a*() pool; calls still queued are cancelled."""
         with self._lock:
-            if self._cast:
-                return self._cast.name
-            if self._roku_device:
-                return self._roku_device.name
-            if self._airplay_device:
-                return self._airplay_device.name
-            return ""
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cast-io")
+            return self._pool.submit(fn, *args)
 
     # ------------------------------------------------------------------
     # Casting
@@ -194,13 +386,7 @@ class CastManager:
 
     def cast_url(self, url: str, content_type: str, title: str = "") -> None:
         """Cast a remote URL directly."""
-        if self._active_backend == "roku":
-            self._roku_cast_url(url, content_type)
-            return
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        mc = self._media_controller()
-        mc.play_media(url, content_type, title=title or url)
+        self._backend.cast_url(url, content_type, title or url)
 
     def cast_file(self, file_path: str | Path, server_url: str, title: str = "") -> None:
         """
@@ -208,82 +394,36 @@ class CastManager:
         that the MediaServer is exposing for this file.
         """
         path = Path(file_path)
-        mime, _ = mimetypes.guess_type(str(path))
-        if not mime:
-            mime = "application/octet-stream"
-        if self._active_backend == "roku":
-            self._roku_cast_url(server_url, mime)
-            return
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        mc = self._media_controller()
-        mc.play_media(server_url, mime, title=title or path.name)
+        mime = _mime_for_ext(path.suffix.lower())
+        self._backend.cast_url(server_url, mime, title or path.name)
 
     # ------------------------------------------------------------------
     # Playback controls
     # ------------------------------------------------------------------
 
     def play(self) -> None:
-        if self._active_backend == "roku":
-            self._roku_keypress("Play")
-            return
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        self._media_controller().play()
+        self._backend.play()
 
     def pause(self) -> None:
-        if self._active_backend == "roku":
-            self._roku_keypress("Play")
-            return
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        self._media_controller().pause()
+        self._backend.pause()
 
     def stop(self) -> None:
-        if self._active_backend == "roku":
-            self._roku_keypress("Home")
-            return
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        self._media_controller().stop()
+        self._backend.stop()
 
     def seek(self, seconds: float) -> None:
-        if self._active_backend == "roku":
-            raise RuntimeError("Roku no soporta seek absoluto")
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        self._media_controller().seek(seconds)
+        self._backend.seek(seconds)
 
     def set_volume(self, level: float) -> None:
         """level: 0.0 – 1.0"""
         level = max(0.0, min(1.0, level))
-        if self._active_backend == "roku":
-            raise RuntimeError("Roku no soporta volumen por API estándar")
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        with self._lock:
-            if self._cast:
-                self._cast.set_volume(level)
+        self._backend.set_volume(level)
         self.state.volume = level
 
     def toggle_mute(self) -> None:
-        if self._active_backend == "roku":
-            raise RuntimeError("Roku no soporta mute por API estándar")
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        with self._lock:
-            if self._cast:
-                self._cast.set_volume_muted(not self.state.is_muted)
+        self._backend.toggle_mute()
 
     def quit_app(self) -> None:
-        if self._active_backend == "roku":
-            self._roku_keypress("Home")
-            return
-        if self._active_backend == "airplay":
-            raise RuntimeError("AirPlay backend pendiente de implementacion")
-        with self._lock:
-            if self._cast:
-                self._cast.quit_app()
+        self._backend.quit_app()
 
     # ------------------------------------------------------------------
     # Internal
@@ -296,13 +436,17 @@ class CastManager:
             return self._cast.media_controller
 
     def _connect_roku(self, device: DeviceInfo, timeout: float = 10.0) -> None:
-        url = f"http://{device.host}:{device.port}/query/device-info"
-        req = Request(url, method="GET")
-        with urlopen(req, timeout=timeout):
-            pass
+        conn = http.client.HTTPConnection(device.host, device.port, timeout=timeout)
+        try:
+            _roku_http(conn, "GET", "/query/device-info", timeout)
+        except Exception:
+            conn.close()
+            raise
         with self._lock:
             self._roku_device = device
-            self._active_backend = "roku"
+            self._roku_conn = conn
+            self._roku_last_used = time.monotonic()
+            self._backend = self._roku_backend
             self._cast = None
             self._browser = None
             self._airplay_device = None
@@ -310,7 +454,12 @@ class CastManager:
     def _connect_airplay(self, device: DeviceInfo, timeout: float = 10.0) -> None:
         raise RuntimeError("AirPlay backend pendiente de implementacion")
 
-    def _discover_roku(self, timeout: float = 3.0) -> list[DeviceInfo]:
+    def _discover_roku(
+        self,
+        timeout: float = 3.0,
+        on_device: Callable[[DeviceInfo], None] | None = None,
+    ) -> list[DeviceInfo]:
+        """Find Rokus over SSDP; `on_device` gets each one as soon as it answers."""
         msg = (
             "M-SEARCH * HTTP/1.1\r\n"
             "HOST: 239.255.255.250:1900\r\n"
@@ -320,38 +469,65 @@ class CastManager:
         ).encode("ascii")
 
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-        sock.settimeout(0.4)
-        sock.sendto(msg, ("239.255.255.250", 1900))
-
-        devices: list[DeviceInfo] = []
-        seen: set[str] = set()
-        import time
-        deadline = time.time() + max(1.0, timeout)
+        # The default TTL of 1 is dropped by some multicast-aware APs/routers.
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        sock.setblocking(False)
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+
+        hosts: list[str] = []
+        # Device info is fetched as each host replies, not after the search ends
+        fetch = _reporting(lambda h: self._roku_device_info(h, timeout=1.5), on_device)
+        pool: ThreadPoolExecutor | None = None
+        infos = []
+        start = time.monotonic()
+        deadline = start + max(1.0, timeout)
+        # Multicast is lossy, so the search is repeated with growing gaps.
+        sends = [start + offset for offset in _SSDP_SEND_OFFSETS]
         try:
-            while time.time() < deadline:
-                try:
-                    data, _ = sock.recvfrom(4096)
-                except socket.timeout:
-                    continue
-                headers = _parse_ssdp_headers(data.decode("utf-8", errors="ignore"))
-                location = headers.get("location", "")
-                if not location:
-                    continue
-                host = _host_from_url(location)
-                if not host or host in seen:
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if sends and now >= sends[0]:
+                    sends.pop(0)
+                    sock.sendto(msg, _SSDP_ADDR)
                     continue
-                info = self._roku_device_info(host, timeout=1.5)
-                if info is None:
+                if not sel.select(min(sends[0] if sends else deadline, deadline) - now):
                     continue
-                seen.add(host)
-                devices.append(info)
+                for data in _drain(sock):
+                    location = _ssdp_location(data)
+                    if not location:
+                        continue
+                    host = _host_from_url(location)
+                    if host and host not in hosts:
+                        hosts.append(host)
+                        if pool is None:
+                            pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="roku-info")
+                        infos.append(pool.submit(fetch, host))
         finally:
+            sel.close()
             sock.close()
-        return devices
+            if pool is not None:
+                pool.shutdown(wait=True)
+        return [info for info in (f.result() for f in infos) if info is not None]
 
     def _discover_airplay(self, timeout: float = 3.0) -> list[DeviceInfo]:
         return []
 
+    def _probe_arp(
+        self,
+        skip: set[str],
+        on_device: Callable[[DeviceInfo], None] | None = None,
+    ) -> list[DeviceInfo]:
+        """Ask ARP neighbours with the cast port open for their device info."""
+        hosts = [h for h in _arp_neighbors() if h not in skip]
+        if not hosts:
+            return []
+        with ThreadPoolExecutor(max_workers=min(16, len(hosts))) as pool:
+            infos = pool.map(_reporting(_chromecast_device_info, on_device), hosts)
+        return [info for info in infos if info is not None]
+
     def _roku_device_info(self, host: str, timeout: float = 2.0) -> DeviceInfo | None:
         url = f"http://{host}:8060/query/device-info"
         req = Request(url, method="GET")
@@ -376,31 +552,38 @@ class CastManager:
         )
 
     def _roku_keypress(self, key: str, timeout: float = 3.0) -> None:
-        with self._lock:
-            device = self._roku_device
-        if not device:
-            raise RuntimeError("Not connected to any Roku device")
-        req = Request(f"http://{device.host}:{device.port}/keypress/{key}", method="POST")
-        with urlopen(req, timeout=timeout):
-            pass
+        self._roku_request("POST", f"/keypress/{key}", timeout)
 
     def _roku_cast_url(self, url: str, content_type: str, timeout: float = 5.0) -> None:
-        with self._lock:
-            device = self._roku_device
-        if not device:
-            raise RuntimeError("Not connected to any Roku device")
         media_type = "v"
         if content_type.startswith("audio/"):
             media_type = "a"
         elif content_type.startswith("image/"):
             media_type = "p"
         encoded = quote_plus(url)
-        req = Request(
-            f"http://{device.host}:{device.port}/input/15985?t={media_type}&u={encoded}",
-            method="POST",
-        )
-        with urlopen(req, timeout=timeout):
-            pass
+        self._roku_request("POST", f"/input/15985?t={media_type}&u={encoded}", timeout)
+
+    def _roku_request(self, method: str, path: str, timeout: float) -> bytes:
+        """Send an ECP request over the connected Roku's kept-alive connection."""
+        with self._lock:
+            conn = self._roku_conn if self._roku_device else None
+        if conn is None:
+            raise RuntimeError("Not connected to any Roku device")
+        with self._roku_http_lock:
+            # Keypresses like Play toggle, so a request that may have reached
+            # the Roku is never resent; instead a socket that is likely dead
+            # gets replaced up front (http.client reconnects on the next send)
+            if time.monotonic() - self._roku_last_used > ROKU_IDLE_REOPEN or _peer_closed(conn.sock):
+                conn.close()
+            try:
+                return _roku_http(conn, method, path, timeout)
+            except (http.client.HTTPException, OSError):
+                if method != "GET":
+                    raise
+                # Queries are safe to repeat on a fresh connection
+                return _roku_http(conn, method, path, timeout)
+            finally:
+                self._roku_last_used = time.monotonic()
 
     def _on_media_status(self, status: MediaStatus) -> None:
         """Called by pychromecast when media state changes."""
@@ -411,18 +594,82 @@ class CastManager:
         self.state.current_time = status.current_time or 0.0
         self.state.duration = status.duration or 0.0
 
-        mapping = {
-            "PLAYING": "playing",
-            "PAUSED": "paused",
-            "BUFFERING": "buffering",
-            "IDLE": "idle",
-        }
-        self.state.status = mapping.get(player_state.upper(), "idle")
+        self.state.status = _PLAYER_STATE_MAP.get(player_state.upper(), "idle")
 
         if self._on_state_change:
             self._on_state_change(self.state)
 
 
+class _ChromecastBackend:
+    """Playback controls for the manager's connected Chromecast."""
+
+    def __init__(self, manager: CastManager):
+        self._manager = manager
+
+    def cast_url(self, url: str, content_type: str, title: str) -> None:
+        self._manager._media_controller().play_media(url, content_type, title=title)
+
+    def play(self) -> None:
+        self._manager._media_controller().play()
+
+    def pause(self) -> None:
+        self._manager._media_controller().pause()
+
+    def stop(self) -> None:
+        self._manager._media_controller().stop()
+
+    def seek(self, seconds: float) -> None:
+        self._manager._media_controller().seek(seconds)
+
+    def set_volume(self, level: float) -> None:
+        manager = self._manager
+        with manager._lock:
+            if manager._cast:
+                manager._cast.set_volume(level)
+
+    def toggle_mute(self) -> None:
+        manager = self._manager
+        with manager._lock:
+            if manager._cast:
+                manager._cast.set_volume_muted(not manager.state.is_muted)
+
+    def quit_app(self) -> None:
+        manager = self._manager
+        with manager._lock:
+            if manager._cast:
+                manager._cast.quit_app()
+
+
+class _RokuBackend:
+    """Playback controls for the manager's connected Roku, over ECP."""
+
+    def __init__(self, manager: CastManager):
+        self._manager = manager
+
+    def cast_url(self, url: str, content_type: str, title: str) -> None:
+        self._manager._roku_cast_url(url, content_type)
+
+    def play(self) -> None:
+        self._manager._roku_keypress("Play")
+
+    # ECP only has a play/pause toggle
+    pause = play
+
+    def stop(self) -> None:
+        self._manager._roku_keypress("Home")
+
+    quit_app = stop
+
+    def seek(self, seconds: float) -> None:
+        raise RuntimeError("Roku no soporta seek absoluto")
+
+    def set_volume(self, level: float) -> None:
+        raise RuntimeError("Roku no soporta volumen por API estándar")
+
+    def toggle_mute(self) -> None:
+        raise RuntimeError("Roku no soporta mute por API estándar")
+
+
 class _StatusListener(MediaStatusListener):
     def __init__(self, callback: Callable[[MediaStatus], None]):
         self._callback = callback
@@ -434,21 +681,143 @@ class _StatusListener(MediaStatusListener):
         pass
 
 
-def _parse_ssdp_headers(payload: str) -> dict[str, str]:
-    headers: dict[str, str] = {}
-    lines = payload.splitlines()
-    for line in lines[1:]:
-        if ":" not in line:
-            continue
-        key, value = line.split(":", 1)
-        headers[key.strip().lower()] = value.strip()
-    return headers
+def _reporting(fetch: Callable, on_device: Callable[[DeviceInfo], None] | None) -> Callable:
+    """Wrap a host -> DeviceInfo | None lookup so hits also go to `on_device`."""
+    if on_device is None:
+        return fetch
+
+    def _fetch(host):
+        info = fetch(host)
+        if info is not None:
+            on_device(info)
+        return info
+
+    return _fetch
+
+
+def _first(sources: tuple, attr: str, default):
+    """First truthy `attr` among `sources`, looked up lazily in order."""
+    for source in sources:
+        value = getattr(source, attr, None)
+        if value:
+            return value
+    return default
+
+
+def _device_from_chromecast(cc) -> DeviceInfo:
+    cast_info = getattr(cc, "cast_info", None)
+    sources = (cc, cast_info) if cast_info is not None else (cc,)
+    return DeviceInfo(
+        name=(
+            getattr(cc, "name", None)
+            or _first(sources[1:], "friendly_name", "Unknown Chromecast")
+        ),
+        host=_first(sources, "host", ""),
+        port=_first(sources, "port", 8009),
+        model_name=_first(sources, "model_name", "Chromecast"),
+        cast_type=_first(sources, "cast_type", "cast"),
+        backend="chromecast",
+    )
+
+
+def _arp_neighbors(path: str = "/proc/net/arp") -> list[str]:
+    """Return the IPv4 addresses of resolved ARP entries (Linux only)."""
+    try:
+        with open(path, encoding="ascii", errors="ignore") as f:
+            lines = f.read().splitlines()[1:]
+    except OSError:
+        return []
+    hosts = []
+    for line in lines:
+        fields = line.split()
+        # Flags 0x0 means the entry is incomplete.
+        if len(fields) >= 4 and fields[2] != "0x0" and fields[3] != "00:00:00:00:00:00":
+            hosts.append(fields[0])
+    return hosts
+
+
+def _chromecast_device_info(host: str, port: int = 8009) -> DeviceInfo | None:
+    try:
+        with socket.create_connection((host, port), timeout=PROBE_TIMEOUT):
+            pass
+    except OSError:
+        return None
+    status = pychromecast.dial.get_device_info(host, timeout=PROBE_TIMEOUT * 2)
+    if status is None:
+        return None
+    return DeviceInfo(
+        name=status.friendly_name or "Unknown Chromecast",
+        host=host,
+        port=port,
+        model_name=status.model_name or "Chromecast",
+        cast_type=status.cast_type or "cast",
+        backend="chromecast",
+    )
+
+
+@lru_cache(maxsize=64)
+def _mime_for_ext(ext: str) -> str:
+    mime, _ = mimetypes.guess_type("x" + ext)
+    return mime or "application/octet-stream"
+
+
+def _roku_http(conn: http.client.HTTPConnection, method: str, path: str, timeout: float) -> bytes:
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    try:
+        conn.request(method, path)
+        resp = conn.getresponse()
+        body = resp.read()
+    except BaseException:
+        # A timed-out or half-sent request leaves the connection mid-exchange,
+        # where every later request fails with CannotSendRequest
+        conn.close()
+        raise
+    if resp.status >= 400:
+        raise RuntimeError(f"Roku request failed: HTTP {resp.status} {resp.reason}")
+    return body
+
+
+def _peer_closed(sock: socket.socket | None) -> bool:
+    """True if an idle keep-alive socket is readable, i.e. the peer hung up."""
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _drain(sock: socket.socket) -> list[bytes]:
+    """Every datagram already queued on the non-blocking `sock`."""
+    packets: list[bytes] = []
+    while True:
+        try:
+            data, _ = sock.recvfrom(4096)
+        except (BlockingIOError, InterruptedError):
+            return packets
+        packets.append(data)
+
+
+def _ssdp_location(data: bytes) -> str:
+    """LOCATION header of an SSDP reply, the only one discovery needs."""
+    m = _LOCATION_RE.search(data)
+    return m.group(1).decode("ascii", errors="ignore") if m else ""
 
 
-def _host_from_url(url: str) -> str:
-    if "//" not in url:
+def network_key() -> str:
+    """Identify the local network by the address of the outbound interface."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(("8.8.8.8", 80))
+        return s.getsockname()[0]
+    except OSError:
         return ""
-    host_port = url.split("//", 1)[1].split("/", 1)[0]
-    if ":" in host_port:
-        return host_port.split(":", 1)[0]
-    return host_port
+    finally:
+        s.close()
+
+
+def _host_from_url(url: str) -> str:
+    return urlsplit(url).hostname or ""
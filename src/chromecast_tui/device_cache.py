@@ -0,0 +1,46 @@
+"""
+On-disk cache of the last discovered devices, so a restart can fill the
+device table before the first network scan finishes.
+
+Each local network gets its own file, so devices from home don't show up
+as stale entries on another network.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+
+from .cast_manager import DeviceInfo, network_key
+
+
+def cache_path(net_id: str | None = None) -> Path:
+    """Cache file for `net_id`, defaulting to the network we're on now."""
+    if net_id is None:
+        net_id = network_key()
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    if not net_id:
+        return Path(base) / "chromecast-tui" / "devices.json"
+    digest = hashlib.sha1(net_id.encode("utf-8")).hexdigest()[:16]
+    return Path(base) / "chromecast-tui" / f"devices-{digest}.json"
+
+
+def load(path: Path | None = None) -> list[DeviceInfo]:
+    """Return the cached devices, or an empty list if there is no usable cache."""
+    path = path or cache_path()
+    try:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+        return [DeviceInfo(**entry) for entry in entries]
+    except (OSError, ValueError, TypeError):
+        return []
+
+
+def save(devices: list[DeviceInfo], path: Path | None = None) -> None:
+    """Write `devices` to the cache; failures are ignored, the cache is best-effort."""
+    path = path or cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps([asdict(d) for d in devices]), encoding="utf-8")
+    except OSError:
+        pass
@@ -8,108 +8,167 @@ import json
 import mimetypes
 import os
 import socket
+import stat
 import threading
 import uuid
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Callable
 
 from aiohttp import web
 
-
+# Read/write granularity for file bodies; larger chunks mean fewer syscalls
+# and event-loop round trips per megabyte.
+CHUNK_SIZE = 1 << 20
+# Inbound parser buffer, big enough that CHUNK_SIZE upload reads never stall.
+READ_BUFSIZE = 10 * CHUNK_SIZE
+# Uploads are buffered in memory and handed to a writer thread this much at a time.
+UPLOAD_FLUSH_SIZE = 4 * CHUNK_SIZE
+# Kernel send buffer for media connections, so sendfile can queue more per call.
+SEND_BUFFER_SIZE = 4 << 20
+# Linux-only; elsewhere the headers simply go out on their own.
+_TCP_CORK = getattr(socket, "TCP_CORK", None)
+# How long close() lets in-flight requests finish; aiohttp's 60 s default
+# would hold up quitting for as long as a Chromecast keeps streaming.
+SHUTDOWN_TIMEOUT = 2.0
+
+
+@lru_cache(maxsize=1)
 def get_local_ip() -> str:
-    """Return the machine's LAN IP (the one Chromecast can reach)."""
+    """Return the machine's LAN IP (the one Chromecast can reach).
+
+    The result is cached; call refresh_local_ip() after a network change.
+    Falls back to 127.0.0.1 when there is no route out.
+    """
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
         s.connect(("8.8.8.8", 80))
         return s.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
     finally:
         s.close()
 
 
-async def handle_media(request: web.Request) -> web.StreamResponse:
-    """Serve a file with full range-request support for seeking."""
-    rel = request.match_info["path"]
-    file_path = Path("/") / rel
+def refresh_local_ip() -> str:
+    """Forget the cached LAN IP and look it up again."""
+    get_local_ip.cache_clear()
+    return get_local_ip()
 
-    if not file_path.exists() or not file_path.is_file():
+
+async def handle_media(request: web.Request) -> web.StreamResponse:
+    """Serve a file with full range-request support for seeking.
+
+    FileResponse does the Range/If-Range/HEAD/416 handling and sends the body
+    with sendfile(2) where the transport allows it.
+    """
+    # The path lookups block, so they run off the loop in one executor job
+    loop = asyncio.get_running_loop()
+    file_path = await loop.run_in_executor(None, _media_file, request.match_info["path"])
+    if file_path is None:
         raise web.HTTPNotFound()
 
-    mime, _ = mimetypes.guess_type(str(file_path))
-    if mime is None:
-        mime = "application/octet-stream"
+    return _MediaFileResponse(
+        file_path,
+        chunk_size=CHUNK_SIZE,
+        headers=_media_headers(file_path.suffix.lower()),
+    )
+
+
+class _MediaFileResponse(web.FileResponse):
+    """FileResponse with the socket tuned for streaming while it's sent."""
+
+    async def prepare(self, request: web.BaseRequest):
+        # aiohttp already turns Nagle off; corking holds the headers back so
+        # they leave in the same segment as the start of the sendfile body
+        sock = _plain_tcp_socket(request)
+        _set_socket_opt(sock, socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+        _set_socket_opt(sock, socket.IPPROTO_TCP, _TCP_CORK, 1)
+        try:
+            return await super().prepare(request)
+        finally:
+            _set_socket_opt(sock, socket.IPPROTO_TCP, _TCP_CORK, 0)
+
+
+def _plain_tcp_socket(request: web.BaseRequest):
+    """The connection's socket, or None for TLS or already-closed transports."""
+    transport = request.transport
+    if transport is None or transport.get_extra_info("sslcontext") is not None:
+        return None
+    return transport.get_extra_info("socket")
+
+
+def _set_socket_opt(sock, level: int, option: int | None, value: int) -> None:
+    if sock is None or option is None:
+        return
+    try:
+        sock.setsockopt(level, option, value)
+    except OSError:
+        pass
+
+
+def _media_file(rel: str) -> Path | None:
+    """The regular file a request path points at, or None.
+
+    One lstat() of the resolved path; directories and device nodes are None.
+    """
+    try:
+        file_path = _resolve_media_path(rel)
+        st = os.stat(file_path, follow_symlinks=False)
+    except (OSError, RuntimeError, ValueError):
+        return None
+    return file_path if stat.S_ISREG(st.st_mode) else None
 
-    file_size = file_path.stat().st_size
-    range_header = request.headers.get("Range")
 
-    headers = {
-        "Access-Control-Allow-Origin": "*",
+def _resolve_media_path(rel: str) -> Path:
+    """Absolute, symlink-free path for a request path; raises if it doesn't exist.
+
+    Any file the process can read may be served; there is no root to stay in.
+    Not cached: a symlink can be retargeted between two requests.
+    """
+    return (Path("/") / rel).resolve(strict=True)
+
+
+@lru_cache(maxsize=256)
+def _media_headers(suffix: str) -> MappingProxyType:
+    """Static response headers for a media file, built once per extension."""
+    mime, _ = mimetypes.guess_type("x" + suffix)
+    return MappingProxyType({
         "Access-Control-Expose-Headers": "Content-Range, Accept-Ranges, Content-Length",
-        "Accept-Ranges": "bytes",
-        "Content-Type": mime,
-    }
-
-    if range_header:
-        # Parse "bytes=start-end"
-        range_val = range_header.replace("bytes=", "")
-        parts = range_val.split("-")
-        start = int(parts[0]) if parts[0] else 0
-        end = int(parts[1]) if parts[1] else file_size - 1
-        end = min(end, file_size - 1)
-        length = end - start + 1
-
-        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
-        headers["Content-Length"] = str(length)
-
-        response = web.StreamResponse(status=206, headers=headers)
-        await response.prepare(request)
-
-        with open(file_path, "rb") as f:
-            f.seek(start)
-            remaining = length
-            chunk_size = 65536
-            while remaining > 0:
-                chunk = f.read(min(chunk_size, remaining))
-                if not chunk:
-                    break
-                await response.write(chunk)
-                remaining -= len(chunk)
-    else:
-        headers["Content-Length"] = str(file_size)
-        response = web.StreamResponse(status=200, headers=headers)
-        await response.prepare(request)
-
-        with open(file_path, "rb") as f:
-            while True:
-                chunk = f.read(65536)
-                if not chunk:
-                    break
-                await response.write(chunk)
-
-    await response.write_eof()
+        "Content-Type": mime or "application/octet-stream",
+    })
+
+
+_OPTIONS_HEADERS = MappingProxyType({
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, OPTIONS",
+    "Access-Control-Allow-Headers": "Range",
+})
+
+_CORS_HEADERS = MappingProxyType({
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Range",
+})
+
+
+@web.middleware
+async def _cors_middleware(request: web.Request, handler):
+    """Add the shared CORS headers to every response a handler returns."""
+    response = await handler(request)
+    if not response.prepared:
+        for key, value in _CORS_HEADERS.items():
+            response.headers.setdefault(key, value)
     return response
 
 
 async def handle_options(request: web.Request) -> web.Response:
     """Handle CORS preflight."""
-    return web.Response(
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, OPTIONS",
-            "Access-Control-Allow-Headers": "Range",
-        }
-    )
+    return web.Response(headers=_OPTIONS_HEADERS)
 
 
-def _cors_headers() -> dict[str, str]:
-    return {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type, Range",
-    }
-
-
-async def handle_remote_page(request: web.Request) -> web.Response:
-    html = """
+_REMOTE_HTML = """
 <!doctype html>
 <html>
 <head>
@@ -166,7 +225,15 @@ async def handle_remote_page(request: web.Request) -> web.Response:
 </body>
 </html>
 """
-    return web.Response(text=html, content_type="text/html", headers=_cors_headers())
+_REMOTE_HTML_BYTES = _REMOTE_HTML.encode("utf-8")
+
+
+async def handle_remote_page(request: web.Request) -> web.Response:
+    return web.Response(
+        body=_REMOTE_HTML_BYTES,
+        content_type="text/html",
+        charset="utf-8",
+    )
 
 
 async def handle_cast_url(request: web.Request) -> web.Response:
@@ -178,12 +245,12 @@ async def handle_cast_url(request: web.Request) -> web.Response:
     url = str(payload.get("url", "")).strip()
     title = str(payload.get("title", "")).strip()
     if not url:
-        return web.json_response({"ok": False, "error": "missing url"}, status=400, headers=_cors_headers())
+        return web.json_response({"ok": False, "error": "missing url"}, status=400)
     try:
         callback(url, title)
     except Exception as e:
-        return web.json_response({"ok": False, "error": str(e)}, status=500, headers=_cors_headers())
-    return web.json_response({"ok": True, "url": url}, headers=_cors_headers())
+        return web.json_response({"ok": False, "error": str(e)}, status=500)
+    return web.json_response({"ok": True, "url": url})
 
 
 async def handle_upload_cast(request: web.Request) -> web.Response:
@@ -192,16 +259,30 @@ async def handle_upload_cast(request: web.Request) -> web.Response:
     reader = await request.multipart()
     field = await reader.next()
     if field is None or field.name != "file":
-        return web.json_response({"ok": False, "error": "missing file"}, status=400, headers=_cors_headers())
+        return web.json_response({"ok": False, "error": "missing file"}, status=400)
     filename = field.filename or "upload.bin"
     ext = Path(filename).suffix
     saved = upload_dir / f"{uuid.uuid4().hex}{ext}"
-    with open(saved, "wb") as f:
+    # Chunks go straight into the destination through worker threads, so a slow
+    # disk doesn't stall the loop; batched so that's one hop per UPLOAD_FLUSH_SIZE
+    f = await asyncio.to_thread(open, saved, "wb")
+    try:
+        buf = bytearray()
         while True:
-            chunk = await field.read_chunk()
+            chunk = await field.read_chunk(size=CHUNK_SIZE)
             if not chunk:
                 break
-            f.write(chunk)
+            buf += chunk
+            if len(buf) >= UPLOAD_FLUSH_SIZE:
+                await asyncio.to_thread(f.write, bytes(buf))
+                buf.clear()
+        if buf:
+            await asyncio.to_thread(f.write, bytes(buf))
+        await asyncio.to_thread(f.close)
+    except BaseException:
+        # A dropped or cancelled upload leaves no partial file behind
+        await asyncio.to_thread(_discard, f, saved)
+        raise
     rel = str(saved.resolve()).lstrip("/")
     media_url = f"{request.scheme}://{request.host}/{rel}"
     try:
@@ -210,16 +291,20 @@ async def handle_upload_cast(request: web.Request) -> web.Response:
         return web.json_response(
             {"ok": False, "error": str(e), "url": media_url},
             status=500,
-            headers=_cors_headers(),
         )
-    return web.json_response({"ok": True, "url": media_url, "name": filename}, headers=_cors_headers())
+    return web.json_response({"ok": True, "url": media_url, "name": filename})
+
+
+def _discard(f, path: Path) -> None:
+    f.close()
+    path.unlink(missing_ok=True)
 
 
 def make_app(
     on_remote_cast: Callable[[str, str], None] | None = None,
     upload_dir: str | Path | None = None,
 ) -> web.Application:
-    app = web.Application()
+    app = web.Application(client_max_size=READ_BUFSIZE, middlewares=[_cors_middleware])
     app["on_remote_cast"] = on_remote_cast or (lambda _url, _title: None)
     upload_path = Path(upload_dir or ".uploads").resolve()
     upload_path.mkdir(parents=True, exist_ok=True)
@@ -245,40 +330,111 @@ class MediaServer:
         self.host = host
         self.port = port
         self.local_ip = get_local_ip()
-        self._on_remote_cast = on_remote_cast
-        self._upload_dir = upload_dir
+        self._url_prefix = f"http://{self.local_ip}:{self.port}/"
+        # Built once; stop()/start() only close and reopen the listening site
+        self._app = make_app(on_remote_cast=on_remote_cast, upload_dir=upload_dir)
         self._thread: threading.Thread | None = None
         self._loop: asyncio.AbstractEventLoop | None = None
         self._runner: web.AppRunner | None = None
+        self._site: web.TCPSite | None = None
+        self._site_lock: asyncio.Lock | None = None
+        self._ready = threading.Event()
 
     def url_for(self, file_path: str | Path) -> str:
         """Return the URL Chromecast should use to fetch a local file."""
-        abs_path = str(Path(file_path).resolve())
+        path = os.fspath(file_path)
+        # Absolute paths are used as-is (the server resolves symlinks itself);
+        # only relative ones need resolving against the cwd
+        if not os.path.isabs(path):
+            path = str(Path(path).resolve())
         # Strip leading slash; the route pattern is /{path:.+}
-        rel = abs_path.lstrip("/")
-        return f"http://{self.local_ip}:{self.port}/{rel}"
+        return self._url_prefix + path.lstrip("/")
 
     def remote_url(self) -> str:
-        return f"http://{self.local_ip}:{self.port}/remote"
-
-    def start(self) -> None:
+        return self._url_prefix + "remote"
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until the server is listening; False if `timeout` expires first."""
+        return self._ready.wait(timeout)
+
+    def start(self, timeout: float = 5.0) -> None:
+        """Start serving in the background; after stop(), listen again.
+
+        A failed re-listen (e.g. the port was taken meanwhile) is raised here.
+        """
+        if self._thread is not None:
+            # The loop and runner survive stop(); just listen again
+            if self._loop is not None:
+                self._call(self._start_site(), timeout)
+            return
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
     def _run(self) -> None:
+        # Stock asyncio loop on purpose: its sendfile() is what keeps media
+        # bodies zero-copy (uvloop has none, so FileResponse would copy them)
         self._loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self._loop)
-        self._loop.run_until_complete(self._serve())
-
-    async def _serve(self) -> None:
-        app = make_app(on_remote_cast=self._on_remote_cast, upload_dir=self._upload_dir)
-        self._runner = web.AppRunner(app)
-        await self._runner.setup()
-        site = web.TCPSite(self._runner, self.host, self.port)
-        await site.start()
-        # Run forever until loop is stopped
-        await asyncio.Event().wait()
-
-    def stop(self) -> None:
-        if self._loop and self._runner:
-            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop)
+        self._site_lock = asyncio.Lock()
+        try:
+            self._loop.run_until_complete(self._start_site())
+            # Run until close(); the site comes and goes with start()/stop()
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def _call(self, coro, timeout: float):
+        """Run `coro` on the server loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _start_site(self) -> None:
+        async with self._site_lock:
+            if self._site is not None:
+                return
+            if self._runner is None:
+                runner = web.AppRunner(
+                    self._app, read_bufsize=READ_BUFSIZE, shutdown_timeout=SHUTDOWN_TIMEOUT
+                )
+                await runner.setup()
+                self._runner = runner
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            self._site = site
+            self._ready.set()
+
+    async def _stop_site(self) -> None:
+        async with self._site_lock:
+            if self._site is None:
+                return
+            self._ready.clear()
+            site, self._site = self._site, None
+            await site.stop()
+
+    async def _cleanup(self) -> None:
+        async with self._site_lock:
+            self._ready.clear()
+            self._site = None
+            runner, self._runner = self._runner, None
+            if runner is not None:
+                # Closes open (kept-alive or streaming) connections and runs on_cleanup
+                await runner.cleanup()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop listening; start() can listen again on the same app and runner."""
+        if self._loop and self._loop.is_running():
+            self._call(self._stop_site(), timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Shut the server down for good, closing connections still open."""
+        thread, loop = self._thread, self._loop
+        if thread is None or loop is None:
+            return
+        if loop.is_running():
+            try:
+                self._call(self._cleanup(), timeout)
+            except TimeoutError:
+                pass
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        self._thread = self._loop = None
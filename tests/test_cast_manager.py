@@ -5,15 +5,23 @@ Tests for CastManager logic that doesn't require a real Chromecast:
 - supported extension set
 """
 
+import http.client
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from unittest.mock import MagicMock, patch
 
 from src.chromecast_tui.cast_manager import (
     CastManager,
+    DeviceInfo,
     PlaybackState,
     SUPPORTED_EXTENSIONS,
+    _arp_neighbors,
     _host_from_url,
-    _parse_ssdp_headers,
+    _mime_for_ext,
+    _ssdp_location,
 )
 
 
@@ -160,6 +168,18 @@ def test_set_volume_no_cast_does_not_raise():
     manager.set_volume(0.5)
 
 
+def test_roku_backend_routes_controls_to_ecp():
+    manager = CastManager()
+    manager._backend = manager._roku_backend
+    with patch.object(manager, "_roku_keypress") as keypress:
+        manager.pause()
+        manager.stop()
+    assert [c.args[0] for c in keypress.call_args_list] == ["Play", "Home"]
+    with pytest.raises(RuntimeError):
+        manager.set_volume(0.5)
+    assert manager.state.volume == 1.0
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # connected property
 # ──────────────────────────────────────────────────────────────────────────────
@@ -215,18 +235,344 @@ def test_discover_supports_cast_info_without_host_attribute():
     assert devices[0].backend == "chromecast"
 
 
-def test_parse_ssdp_headers_lowercases_keys():
+def test_ssdp_location_reads_header_case_insensitively():
     payload = (
-        "HTTP/1.1 200 OK\r\n"
-        "LOCATION: http://192.168.1.77:8060/\r\n"
-        "USN: roku:ecp:abcdef\r\n\r\n"
+        b"HTTP/1.1 200 OK\r\n"
+        b"Cache-Control: max-age=3600\r\n"
+        b"Location: http://192.168.1.77:8060/ \r\n"
+        b"USN: roku:ecp:abcdef\r\n\r\n"
     )
-    headers = _parse_ssdp_headers(payload)
-    assert headers["location"] == "http://192.168.1.77:8060/"
-    assert headers["usn"] == "roku:ecp:abcdef"
+    assert _ssdp_location(payload) == "http://192.168.1.77:8060/"
+    assert _ssdp_location(b"HTTP/1.1 200 OK\r\n\r\n") == ""
 
 
 def test_host_from_url_extracts_host():
     assert _host_from_url("http://192.168.1.77:8060/desc.xml") == "192.168.1.77"
     assert _host_from_url("https://roku.local/path") == "roku.local"
     assert _host_from_url("not-a-url") == ""
+
+
+def test_host_from_url_handles_ipv6_literals():
+    assert _host_from_url("http://[fe80::1]:8060/") == "fe80::1"
+
+
+def test_mime_for_ext_falls_back_to_octet_stream():
+    assert _mime_for_ext(".mp4") == "video/mp4"
+    assert _mime_for_ext(".nope") == "application/octet-stream"
+
+
+def test_discover_returns_cached_devices_within_ttl():
+    manager = CastManager()
+    with patch.object(manager, "_scan", return_value=[MagicMock()]) as scan:
+        first = manager.discover(timeout=1.0)
+        second = manager.discover(timeout=1.0)
+    assert scan.call_count == 1
+    assert first == second
+
+
+def test_discover_force_bypasses_cache():
+    manager = CastManager()
+    with patch.object(manager, "_scan", return_value=[]) as scan:
+        manager.discover(timeout=1.0)
+        manager.discover(timeout=1.0, force=True)
+    assert scan.call_count == 2
+
+
+def test_cached_devices_expire_after_ttl():
+    manager = CastManager(cache_ttl=0.0)
+    with patch.object(manager, "_scan", return_value=[]):
+        manager.discover(timeout=1.0)
+    assert manager.cached_devices() is None
+
+
+def test_failed_connect_invalidates_discovery_cache():
+    manager = CastManager()
+    roku = DeviceInfo("Den", "192.168.1.77", 8060, "Roku", "roku", backend="roku")
+    with patch.object(manager, "_scan", return_value=[roku]):
+        manager.discover(timeout=1.0)
+    with patch.object(manager, "_connect_roku", side_effect=OSError("timed out")):
+        with pytest.raises(OSError):
+            manager.connect(roku)
+    assert manager.cached_devices() is None
+
+
+def test_discover_iter_reports_devices_and_exits_early():
+    manager = CastManager()
+
+    cast_info = MagicMock()
+    cast_info.friendly_name = "Bedroom"
+    cast_info.host = "192.168.1.43"
+    cast_info.port = 8009
+    cast_info.model_name = "Chromecast"
+    cast_info.cast_type = "cast"
+    cc = MagicMock(spec=["cast_info"])
+    cc.cast_info = cast_info
+
+    def _fake_get_chromecasts(blocking=True, callback=None, **_kwargs):
+        callback(cc)
+        return object()
+
+    seen = []
+    with patch("src.chromecast_tui.cast_manager.pychromecast.get_chromecasts", side_effect=_fake_get_chromecasts):
+        with patch("src.chromecast_tui.cast_manager.pychromecast.stop_discovery"):
+            with patch.object(manager, "_discover_roku", return_value=[]):
+                with patch.object(manager, "_probe_arp", return_value=[]):
+                    devices = manager.discover_iter(seen.append, min_timeout=0.05, max_timeout=5.0)
+
+    assert [d.name for d in devices] == ["Bedroom"]
+    assert seen == devices
+    assert manager.cached_devices() == devices
+
+
+def test_discover_iter_reports_each_host_once_across_probes():
+    manager = CastManager()
+    tv = DeviceInfo("Living Room", "192.168.1.42", 8009, "Chromecast", "cast")
+    roku = DeviceInfo("Den", "192.168.1.77", 8060, "Roku", "roku", backend="roku")
+    captured = {}
+
+    def _fake_get_chromecasts(blocking=True, callback=None, known_hosts=None, **_kwargs):
+        captured["known_hosts"] = known_hosts
+        return object()
+
+    seen = []
+    with patch("src.chromecast_tui.cast_manager.pychromecast.get_chromecasts", side_effect=_fake_get_chromecasts):
+        with patch("src.chromecast_tui.cast_manager.pychromecast.stop_discovery"):
+            with patch.object(manager, "_discover_roku", return_value=[roku]):
+                with patch.object(manager, "_roku_device_info", return_value=roku):
+                    with patch.object(manager, "_probe_arp", return_value=[tv]) as probe_arp:
+                        devices = manager.discover_iter(
+                            seen.append, min_timeout=0.05, max_timeout=5.0, known=[tv, roku],
+                        )
+
+    assert captured["known_hosts"] == ["192.168.1.42"]
+    probe_arp.assert_called_once()
+    assert probe_arp.call_args.args == ({"192.168.1.42", "192.168.1.77"},)
+    assert sorted(d.host for d in devices) == ["192.168.1.42", "192.168.1.77"]
+    assert seen == devices
+
+
+def test_discover_iter_keeps_a_cast_group_on_its_leaders_ip():
+    manager = CastManager()
+    tv = DeviceInfo("Living Room", "192.168.1.42", 8009, "Chromecast", "cast")
+
+    group_info = MagicMock()
+    group_info.friendly_name = "Whole House"
+    group_info.host = "192.168.1.42"
+    group_info.port = 32187
+    group_info.model_name = "Google Cast Group"
+    group_info.cast_type = "group"
+    group = MagicMock(spec=["cast_info"])
+    group.cast_info = group_info
+
+    def _fake_get_chromecasts(blocking=True, callback=None, **_kwargs):
+        callback(group)
+        return object()
+
+    with patch("src.chromecast_tui.cast_manager.pychromecast.get_chromecasts", side_effect=_fake_get_chromecasts):
+        with patch("src.chromecast_tui.cast_manager.pychromecast.stop_discovery"):
+            with patch.object(manager, "_discover_roku", return_value=[]):
+                with patch.object(manager, "_probe_arp", return_value=[tv]):
+                    devices = manager.discover_iter(lambda _d: None, min_timeout=0.05, max_timeout=5.0)
+
+    assert sorted((d.host, d.port) for d in devices) == [("192.168.1.42", 8009), ("192.168.1.42", 32187)]
+
+
+def test_discover_iter_does_not_wait_for_a_slow_roku_probe():
+    manager = CastManager()
+    tv = DeviceInfo("Living Room", "192.168.1.42", 8009, "Chromecast", "cast")
+    roku = DeviceInfo("Den", "192.168.1.77", 8060, "Roku", "roku", backend="roku")
+    roku_done = threading.Event()
+
+    def _fake_get_chromecasts(blocking=True, callback=None, **_kwargs):
+        return object()
+
+    def _slow_roku(timeout=3.0, on_device=None):
+        time.sleep(0.5)
+        on_device(roku)
+        roku_done.set()
+        return [roku]
+
+    seen = []
+    with patch("src.chromecast_tui.cast_manager.pychromecast.get_chromecasts", side_effect=_fake_get_chromecasts):
+        with patch("src.chromecast_tui.cast_manager.pychromecast.stop_discovery"):
+            with patch.object(manager, "_discover_roku", side_effect=_slow_roku):
+                with patch.object(manager, "_probe_arp", return_value=[tv]):
+                    started = time.monotonic()
+                    devices = manager.discover_iter(seen.append, min_timeout=0.05, max_timeout=5.0)
+                    elapsed = time.monotonic() - started
+                    assert roku_done.wait(2.0)
+
+    assert elapsed < 0.4
+    assert devices == [tv]
+    # The late Roku hit arrives after the scan returned, so it isn't reported
+    assert seen == [tv]
+
+
+def test_async_pool_is_created_on_first_use_and_shut_down():
+    manager = CastManager()
+    assert manager._pool is None
+    with patch.object(manager, "_scan", return_value=[]):
+        assert manager.adiscover(timeout=1.0).result(timeout=5) == []
+    pool = manager._pool
+    assert pool is not None
+    manager.shutdown()
+    assert manager._pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(lambda: None)
+
+
+def test_overlapping_connects_are_serialized():
+    manager = CastManager()
+    roku = DeviceInfo("Den", "192.168.1.77", 8060, "Roku", "roku", backend="roku")
+    active = 0
+    overlap = []
+    counter_lock = threading.Lock()
+
+    def _slow_connect(device, timeout):
+        nonlocal active
+        with counter_lock:
+            active += 1
+            overlap.append(active)
+        time.sleep(0.05)
+        with counter_lock:
+            active -= 1
+
+    with patch.object(manager, "_connect", side_effect=_slow_connect):
+        # One from the a*() pool, one from another thread, as a reconnect would
+        future = manager.aconnect(roku)
+        other = threading.Thread(target=manager.connect, args=(roku,))
+        other.start()
+        future.result(timeout=5)
+        other.join(5)
+    manager.shutdown()
+    assert overlap == [1, 1]
+
+
+def test_arp_neighbors_skips_incomplete_entries(tmp_path):
+    arp = tmp_path / "arp"
+    arp.write_text(
+        "IP address       HW type     Flags       HW address            Mask     Device\n"
+        "192.168.1.42     0x1         0x2         aa:bb:cc:dd:ee:ff     *        wlan0\n"
+        "192.168.1.50     0x1         0x0         00:00:00:00:00:00     *        wlan0\n"
+    )
+    assert _arp_neighbors(str(arp)) == ["192.168.1.42"]
+    assert _arp_neighbors(str(tmp_path / "missing")) == []
+
+
+def _serve_roku(handler_body):
+    """Start a fake Roku ECP server; `handler_body(handler)` answers each request."""
+    requests = []
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self):
+            requests.append((self.command, self.path))
+            handler_body(self)
+
+        do_GET = do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, requests
+
+
+def _ok(handler, close=False):
+    body = b"<device-info/>"
+    handler.send_response(200)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+    # Hang up without telling the client, like a Roku dropping an idle socket
+    handler.close_connection = close
+
+
+def test_roku_commands_reuse_one_connection():
+    peers = set()
+
+    def _handler(h):
+        peers.add(h.client_address)
+        _ok(h)
+
+    server, requests = _serve_roku(_handler)
+    try:
+        manager = CastManager()
+        roku = DeviceInfo("Den", "127.0.0.1", server.server_address[1], "Roku", "roku", backend="roku")
+        manager.connect(roku)
+        manager.play()
+        manager.stop()
+        manager.disconnect()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert requests == [
+        ("GET", "/query/device-info"),
+        ("POST", "/keypress/Play"),
+        ("POST", "/keypress/Home"),
+    ]
+    assert len(peers) == 1
+
+
+def test_roku_keypress_timeout_does_not_poison_the_next_request():
+    def _handler(h):
+        if h.path == "/keypress/Play":
+            time.sleep(0.5)  # answers after the client has given up
+        _ok(h)
+
+    server, requests = _serve_roku(_handler)
+    try:
+        manager = CastManager()
+        roku = DeviceInfo("Den", "127.0.0.1", server.server_address[1], "Roku", "roku", backend="roku")
+        manager.connect(roku)
+        with pytest.raises(TimeoutError):
+            manager._roku_keypress("Play", timeout=0.1)
+        manager._roku_keypress("Home", timeout=2.0)
+        manager.disconnect()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert requests.count(("POST", "/keypress/Play")) == 1
+    assert ("POST", "/keypress/Home") in requests
+
+
+def test_roku_keypress_is_not_resent_after_a_failed_send():
+    def _handler(h):
+        if h.command == "POST":
+            h.close_connection = True  # drop it without replying
+            return
+        _ok(h)
+
+    server, requests = _serve_roku(_handler)
+    try:
+        manager = CastManager()
+        roku = DeviceInfo("Den", "127.0.0.1", server.server_address[1], "Roku", "roku", backend="roku")
+        manager.connect(roku)
+        with pytest.raises((http.client.HTTPException, ConnectionError)):
+            manager.play()
+        manager.disconnect()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert requests.count(("POST", "/keypress/Play")) == 1
+
+
+def test_roku_keypress_reopens_a_connection_the_roku_dropped():
+    server, requests = _serve_roku(lambda h: _ok(h, close=h.command == "GET"))
+    try:
+        manager = CastManager()
+        roku = DeviceInfo("Den", "127.0.0.1", server.server_address[1], "Roku", "roku", backend="roku")
+        manager.connect(roku)
+        time.sleep(0.1)  # let the server's close reach the client socket
+        manager.play()
+        manager.disconnect()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert requests == [("GET", "/query/device-info"), ("POST", "/keypress/Play")]
@@ -0,0 +1,31 @@
+from src.chromecast_tui import device_cache
+from src.chromecast_tui.cast_manager import DeviceInfo
+
+
+def test_save_then_load_round_trips(tmp_path):
+    path = tmp_path / "devices.json"
+    devices = [
+        DeviceInfo("Living Room", "192.168.1.42", 8009, "Chromecast", "cast"),
+        DeviceInfo("Roku", "192.168.1.77", 8060, "Roku Express", "roku", backend="roku"),
+    ]
+    device_cache.save(devices, path)
+    assert device_cache.load(path) == devices
+
+
+def test_load_missing_file_returns_empty(tmp_path):
+    assert device_cache.load(tmp_path / "nope.json") == []
+
+
+def test_load_corrupt_file_returns_empty(tmp_path):
+    path = tmp_path / "devices.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert device_cache.load(path) == []
+
+
+def test_cache_path_is_per_network(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    home = device_cache.cache_path("192.168.1.10")
+    office = device_cache.cache_path("10.0.0.5")
+    assert home != office
+    assert home.parent == tmp_path / "chromecast-tui"
+    assert device_cache.cache_path("") == tmp_path / "chromecast-tui" / "devices.json"
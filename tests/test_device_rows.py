@@ -0,0 +1,26 @@
+from src.chromecast_tui.app import _row_key, _rows_to_append
+from src.chromecast_tui.cast_manager import DeviceInfo
+
+
+def test_new_devices_are_appended():
+    assert _rows_to_append(["a", "b"], ["a", "b", "c"]) == ["c"]
+
+
+def test_nothing_to_add():
+    assert _rows_to_append(["a", "c"], ["a", "c"]) == []
+
+
+def test_clearing_filter_rebuilds_to_keep_order():
+    # Filtering "bravo" leaves only b; clearing it must show a, b, c, not b, a, c
+    assert _rows_to_append(["b"], ["a", "b", "c"]) is None
+
+
+def test_row_returning_mid_list_rebuilds():
+    assert _rows_to_append(["a", "c"], ["a", "b", "c"]) is None
+
+
+def test_cast_group_and_leader_get_distinct_row_keys():
+    leader = DeviceInfo("Living Room", "192.168.1.42", 8009, "Chromecast", "cast")
+    group = DeviceInfo("Whole House", "192.168.1.42", 32187, "Google Cast Group", "group")
+    assert _row_key(leader) != _row_key(group)
+    assert _rows_to_append([_row_key(leader)], [_row_key(leader), _row_key(group)]) == [_row_key(group)]
@@ -0,0 +1,15 @@
+from src.chromecast_tui.app import _guess_mime
+
+
+def test_guess_mime_from_url_extension():
+    assert _guess_mime("http://example.com/song.mp3") == "audio/mpeg"
+
+
+def test_guess_mime_ignores_query_string():
+    assert _guess_mime("http://example.com/clip.MP4?token=abc#t=10") == "video/mp4"
+    assert _guess_mime("https://cdn.example.com/a/b/photo.png?w=800") == "image/png"
+
+
+def test_guess_mime_defaults_to_video_mp4():
+    assert _guess_mime("http://example.com/stream") == "video/mp4"
+    assert _guess_mime("http://example.com/v1.2/stream") == "video/mp4"
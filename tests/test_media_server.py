@@ -7,41 +7,69 @@ so we verify the actual wire behavior (range parsing, status codes, headers).
 
 import asyncio
 import os
+import socket
 import tempfile
+import threading
+import time
+import urllib.request
+from unittest.mock import patch
 
 import pytest
 import pytest_asyncio
-from aiohttp import ClientSession, FormData
+from aiohttp import BodyPartReader, ClientSession, FormData, web
 from aiohttp.test_utils import TestServer, TestClient
 
-from src.chromecast_tui.media_server import make_app
+from src.chromecast_tui.media_server import MediaServer, get_local_ip, make_app, refresh_local_ip
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Fixtures
 # ──────────────────────────────────────────────────────────────────────────────
 
-@pytest_asyncio.fixture
-async def sample_file():
-    """Write a known binary payload to a temp file and yield its path."""
-    content = b"0123456789" * 100  # 1000 bytes, easy to reason about
-    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-        f.write(content)
-        path = f.name
-    yield path, content
+SAMPLE_CONTENT = b"0123456789" * 100  # 1000 bytes, easy to reason about
+
+
+@pytest.fixture(scope="session")
+def sample_file():
+    """Write a known binary payload to a temp file once and yield its path.
+
+    Tests only read it, so one file serves the whole session.
+    """
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    try:
+        os.write(fd, SAMPLE_CONTENT)
+    finally:
+        os.close(fd)
+    yield path, SAMPLE_CONTENT
     os.unlink(path)
 
 
-@pytest_asyncio.fixture
-async def client(aiohttp_client):
-    app = make_app()
-    return await aiohttp_client(app)
+@pytest.fixture(scope="module")
+def app():
+    """One app (and route table) shared by every test that doesn't customise it.
+
+    An aiohttp app binds to the first loop that serves it, hence the
+    module-scoped loop for this file's async tests.
+    """
+    return make_app()
+
+
+# Tests using `app`/`client` run on this module's loop; see `app`.
+shared_loop = pytest.mark.asyncio(loop_scope="module")
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client(app):
+    """One server and ClientSession for the module, so connections are kept alive."""
+    async with TestClient(TestServer(app)) as c:
+        yield c
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Full-file GET
 # ──────────────────────────────────────────────────────────────────────────────
 
+@shared_loop
 async def test_full_get_returns_200(client, sample_file):
     path, content = sample_file
     rel = path.lstrip("/")
@@ -51,6 +79,7 @@ async def test_full_get_returns_200(client, sample_file):
     assert body == content
 
 
+@shared_loop
 async def test_full_get_content_type_mp4(client, sample_file):
     path, _ = sample_file
     rel = path.lstrip("/")
@@ -58,6 +87,16 @@ async def test_full_get_content_type_mp4(client, sample_file):
     assert "video/mp4" in resp.headers["Content-Type"]
 
 
+@shared_loop
+async def test_unknown_extension_is_octet_stream(client, tmp_path):
+    path = tmp_path / "blob.zzq"
+    path.write_bytes(b"data")
+    resp = await client.get(f"/{str(path).lstrip('/')}")
+    assert resp.headers["Content-Type"] == "application/octet-stream"
+    assert "Content-Range" in resp.headers["Access-Control-Expose-Headers"]
+
+
+@shared_loop
 async def test_full_get_accept_ranges_header(client, sample_file):
     path, _ = sample_file
     rel = path.lstrip("/")
@@ -65,6 +104,7 @@ async def test_full_get_accept_ranges_header(client, sample_file):
     assert resp.headers.get("Accept-Ranges") == "bytes"
 
 
+@shared_loop
 async def test_full_get_cors_header(client, sample_file):
     path, _ = sample_file
     rel = path.lstrip("/")
@@ -76,6 +116,7 @@ async def test_full_get_cors_header(client, sample_file):
 # Range requests (the critical seeking path)
 # ──────────────────────────────────────────────────────────────────────────────
 
+@shared_loop
 async def test_range_returns_206(client, sample_file):
     path, _ = sample_file
     rel = path.lstrip("/")
@@ -83,6 +124,7 @@ async def test_range_returns_206(client, sample_file):
     assert resp.status == 206
 
 
+@shared_loop
 async def test_range_returns_correct_slice(client, sample_file):
     path, content = sample_file
     rel = path.lstrip("/")
@@ -91,6 +133,7 @@ async def test_range_returns_correct_slice(client, sample_file):
     assert body == content[10:20]
 
 
+@shared_loop
 async def test_range_content_range_header(client, sample_file):
     path, content = sample_file
     rel = path.lstrip("/")
@@ -99,6 +142,7 @@ async def test_range_content_range_header(client, sample_file):
     assert resp.headers["Content-Range"] == f"bytes 0-9/{total}"
 
 
+@shared_loop
 async def test_range_content_length_matches_slice(client, sample_file):
     path, _ = sample_file
     rel = path.lstrip("/")
@@ -106,6 +150,7 @@ async def test_range_content_length_matches_slice(client, sample_file):
     assert resp.headers["Content-Length"] == "50"
 
 
+@shared_loop
 async def test_range_open_ended(client, sample_file):
     """bytes=500- should return from byte 500 to EOF."""
     path, content = sample_file
@@ -116,6 +161,7 @@ async def test_range_open_ended(client, sample_file):
     assert body == content[500:]
 
 
+@shared_loop
 async def test_range_last_byte(client, sample_file):
     """bytes=999-999 on a 1000-byte file returns the last byte."""
     path, content = sample_file
@@ -126,6 +172,7 @@ async def test_range_last_byte(client, sample_file):
     assert body == content[999:1000]
 
 
+@shared_loop
 async def test_range_clamped_to_file_size(client, sample_file):
     """An end byte beyond EOF should be clamped, not error."""
     path, content = sample_file
@@ -136,10 +183,46 @@ async def test_range_clamped_to_file_size(client, sample_file):
     assert body == content[990:]
 
 
+@shared_loop
+async def test_range_suffix_returns_tail(client, sample_file):
+    """bytes=-100 means the last 100 bytes, not bytes 0-100."""
+    path, content = sample_file
+    rel = path.lstrip("/")
+    resp = await client.get(f"/{rel}", headers={"Range": "bytes=-100"})
+    assert resp.status == 206
+    assert resp.headers["Content-Range"] == f"bytes 900-999/{len(content)}"
+    assert await resp.read() == content[-100:]
+
+
+@shared_loop
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=20-10", "bytes=abc-", "items=0-9"])
+async def test_bad_range_returns_416(client, sample_file, header):
+    path, content = sample_file
+    rel = path.lstrip("/")
+    resp = await client.get(f"/{rel}", headers={"Range": header})
+    assert resp.status == 416
+    assert resp.headers["Content-Range"] == f"bytes */{len(content)}"
+
+
+@shared_loop
+async def test_range_served_without_native_sendfile(client, sample_file, monkeypatch):
+    """When sendfile isn't available the body is copied through Python instead."""
+    async def _no_sendfile(*args, **kwargs):
+        raise NotImplementedError
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "sendfile", _no_sendfile)
+    path, content = sample_file
+    rel = path.lstrip("/")
+    resp = await client.get(f"/{rel}", headers={"Range": "bytes=100-"})
+    assert resp.status == 206
+    assert await resp.read() == content[100:]
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # CORS preflight
 # ──────────────────────────────────────────────────────────────────────────────
 
+@shared_loop
 async def test_options_preflight(client, sample_file):
     path, _ = sample_file
     rel = path.lstrip("/")
@@ -153,16 +236,48 @@ async def test_options_preflight(client, sample_file):
 # Error cases
 # ──────────────────────────────────────────────────────────────────────────────
 
+@shared_loop
 async def test_missing_file_returns_404(client):
     resp = await client.get("/nonexistent/path/file.mp4")
     assert resp.status == 404
 
 
+@shared_loop
+async def test_symlink_is_served_as_its_target(client, sample_file, tmp_path):
+    path, content = sample_file
+    link = tmp_path / "link.mp4"
+    link.symlink_to(path)
+    resp = await client.get("/" + str(link).lstrip("/"))
+    assert resp.status == 200
+    assert await resp.read() == content
+
+
+@shared_loop
+async def test_retargeted_symlink_serves_new_target(client, tmp_path):
+    first = tmp_path / "a.mp4"
+    second = tmp_path / "b.mp4"
+    first.write_bytes(b"first")
+    second.write_bytes(b"second")
+    link = tmp_path / "link.mp4"
+    link.symlink_to(first)
+    url = "/" + str(link).lstrip("/")
+    assert await (await client.get(url)).read() == b"first"
+
+    link.unlink()
+    link.symlink_to(second)
+    first.unlink()
+    resp = await client.get(url)
+    assert resp.status == 200
+    assert await resp.read() == b"second"
+
+
+@shared_loop
 async def test_directory_returns_404(client):
     resp = await client.get("/tmp")
     assert resp.status == 404
 
 
+@shared_loop
 async def test_remote_page_returns_200(client):
     resp = await client.get("/remote")
     assert resp.status == 200
@@ -170,6 +285,14 @@ async def test_remote_page_returns_200(client):
     assert "Chromecast TUI Remote" in body
 
 
+@shared_loop
+async def test_api_responses_carry_cors_headers(client):
+    resp = await client.post("/api/cast-url", json={})
+    assert resp.status == 400
+    assert resp.headers.get("Access-Control-Allow-Origin") == "*"
+    assert "POST" in resp.headers.get("Access-Control-Allow-Methods", "")
+
+
 async def test_cast_url_calls_callback(aiohttp_client):
     called = []
 
@@ -201,3 +324,138 @@ async def test_upload_cast_saves_file_and_calls_callback(aiohttp_client, tmp_pat
     assert data["ok"] is True
     assert data["name"] == "clip.mp4"
     assert called and called[0][1] == "clip.mp4"
+
+
+async def test_upload_cast_writes_large_upload_intact(aiohttp_client, tmp_path):
+    payload = os.urandom(9 * 1024 * 1024 + 17)  # spans several write batches
+    app = make_app(upload_dir=tmp_path)
+    client = await aiohttp_client(app)
+    form = FormData()
+    form.add_field("file", payload, filename="big.mp4", content_type="video/mp4")
+    resp = await client.post("/api/upload-cast", data=form)
+    assert resp.status == 200
+    saved = list(tmp_path.glob("*.mp4"))
+    assert len(saved) == 1
+    assert saved[0].read_bytes() == payload
+
+
+async def test_upload_cast_removes_partial_file_on_error(aiohttp_client, tmp_path):
+    real_read_chunk = BodyPartReader.read_chunk
+    calls = 0
+
+    async def _dropping_read_chunk(self, size=BodyPartReader.chunk_size):
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            raise ConnectionResetError("client went away")
+        return await real_read_chunk(self, size)
+
+    app = make_app(upload_dir=tmp_path)
+    client = await aiohttp_client(app)
+    form = FormData()
+    form.add_field("file", os.urandom(3 * 1024 * 1024), filename="big.mp4", content_type="video/mp4")
+    with patch.object(BodyPartReader, "read_chunk", _dropping_read_chunk):
+        resp = await client.post("/api/upload-cast", data=form)
+    assert resp.status == 500
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_media_server_reports_ready_once_listening():
+    server = MediaServer(host="127.0.0.1", port=0)
+    assert server.wait_ready(timeout=0) is False
+    server.start()
+    try:
+        assert server.wait_ready(timeout=5.0) is True
+    finally:
+        server.close()
+
+
+def test_media_server_start_returns_before_the_port_is_bound():
+    server = MediaServer(host="127.0.0.1", port=0)
+    release = threading.Event()
+    real_start = web.TCPSite.start
+
+    async def _slow_start(site):
+        await asyncio.get_running_loop().run_in_executor(None, release.wait, 5.0)
+        await real_start(site)
+
+    with patch.object(web.TCPSite, "start", _slow_start):
+        started = time.monotonic()
+        server.start()
+        elapsed = time.monotonic() - started
+        try:
+            # on_mount calls start() directly, so it must not wait for the bind
+            assert elapsed < 0.5
+            assert server.wait_ready(timeout=0) is False
+            release.set()
+            assert server.wait_ready(timeout=5.0) is True
+        finally:
+            release.set()
+            server.close()
+
+
+def test_get_local_ip_falls_back_to_loopback_when_offline():
+    with patch("socket.socket.connect", side_effect=OSError("unreachable")):
+        assert refresh_local_ip() == "127.0.0.1"
+        assert get_local_ip() == "127.0.0.1"
+    refresh_local_ip()
+
+
+def test_url_for_uses_absolute_paths_verbatim():
+    server = MediaServer(host="127.0.0.1", port=8765)
+    prefix = f"http://{server.local_ip}:8765/"
+    assert server.url_for("/media/clip.mp4") == prefix + "media/clip.mp4"
+    assert server.url_for("clip.mp4") == prefix + os.path.abspath("clip.mp4").lstrip("/")
+    assert server.remote_url() == prefix + "remote"
+
+
+def test_media_server_restart_reuses_app_and_runner():
+    server = MediaServer(host="127.0.0.1", port=0)
+    server.start()
+    try:
+        assert server.wait_ready(timeout=5.0) is True
+        app, runner = server._app, server._runner
+        server.stop()
+        assert server.wait_ready(timeout=0) is False
+        server.start()
+        assert server.wait_ready(timeout=5.0) is True
+        assert server._app is app and server._runner is runner
+        host, port = runner.addresses[0][:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/remote", timeout=5) as resp:
+            assert resp.status == 200
+    finally:
+        server.close()
+
+
+def test_media_server_restart_reports_bind_failure():
+    server = MediaServer(host="127.0.0.1", port=0)
+    server.start()
+    try:
+        assert server.wait_ready(timeout=5.0) is True
+        server.stop()
+        with patch("aiohttp.web.TCPSite.start", side_effect=OSError("address in use")):
+            with pytest.raises(OSError):
+                server.start()
+    finally:
+        server.close()
+
+
+def test_media_server_close_drops_open_connections_and_runs_cleanup():
+    server = MediaServer(host="127.0.0.1", port=0)
+    cleaned_up = threading.Event()
+
+    async def _on_cleanup(_app):
+        cleaned_up.set()
+
+    server._app.on_cleanup.append(_on_cleanup)
+    server.start()
+    assert server.wait_ready(timeout=5.0) is True
+    host, port = server._runner.addresses[0][:2]
+    with socket.create_connection((host, port), timeout=5) as sock:
+        sock.sendall(b"GET /remote HTTP/1.1\r\nHost: x\r\nConnection: keep-alive\r\n\r\n")
+        assert sock.recv(4096).startswith(b"HTTP/1.1 200")
+        server.close()
+        # The kept-alive connection is closed by the server, not left open
+        while sock.recv(4096):
+            pass
+    assert cleaned_up.is_set()
@@ -7,3 +7,8 @@ def test_ascii_qr_returns_multiline_block_string():
     assert "██" in out
     lines = out.splitlines()
     assert len(lines) > 10
+
+
+def test_ascii_qr_reuses_rendering_for_same_url():
+    url = "http://192.168.1.10:8765/remote"
+    assert _ascii_qr(url) is _ascii_qr(url)
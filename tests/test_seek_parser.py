@@ -27,3 +27,11 @@ def test_parse_clamps_to_duration():
 
 def test_parse_invalid_returns_none():
     assert _parse_seek_target("abc", 0.0, 0.0) is None
+
+
+def test_parse_relative_fractional():
+    assert _parse_seek_target("+1.5", 10.0, 0.0) == 11.5
+
+
+def test_parse_too_many_fields_returns_none():
+    assert _parse_seek_target("1:02:03:04", 0.0, 0.0) is None